@@ -1,214 +1,251 @@
 import os
 from dotenv import load_dotenv
 load_dotenv()
-MODEL_NAME = os.environ.get("OPENAI_MODEL", "gpt-4o")
-print(f"Using OpenAI model: {MODEL_NAME}")
+from generation import MODEL_NAME
 
+# Heavy dependencies (openai/instructor, PyMuPDF, RenderCV, the YAML editor and PDF viewer
+# components) are imported on first use and warmed up after the first page is sent;
+# see startup_profile.py for the import-time breakdown and time-to-first-render budget.
 import streamlit as st
-from openai import OpenAI
-import fitz  # PyMuPDF
-import io
 import json
-from pydantic import BaseModel, Field, ValidationError, HttpUrl
-from typing import List, Optional
-import instructor
-import datetime
-import subprocess
+import multiprocessing
+import threading
+import time
 import yaml
-import uuid
-from rendercv.cli.commands import cli_command_render
-import base64
-from code_editor import code_editor
+from concurrent.futures import ProcessPoolExecutor
 from streamlit_local_storage import LocalStorage
-from streamlit_pdf_viewer import pdf_viewer
-
-# Pydantic Models for RenderCV Structure
-# These models define the exact structure RenderCV expects.
+from artifact_store import ArtifactStore
+from render_service import RenderCache, RenderService, render_cache_key
+from pdf_extract import content_hash, extract_pdf_text
+from models import CV_SCHEMA_VERSION, build_cv_yaml, experience_entry_key, merge_cv_part
+from generation import (
+    collect_errors,
+    generate_cover_letter,
+    get_completion,
+    get_completion_by_section,
+    get_master_profile,
+    get_response_cache,
+    regenerate_cv_part,
+    stream_completion,
+)
+from master_profile import profile_text, select_relevant
+from job_queue import ACTIVE, DONE, FAILED, JobQueue, JobQueueFull
+from prompt_compression import compress_inputs
+from prompts import compact_cv_text, cover_letter_resume
+from section_engine import SECTION_MODELS
+from response_cache import make_key
+import cv_repair
+import tracing
 
 MOCK_TEST = False  # Set to True for development/testing with mock data
+RESUME_TOKEN_BUDGET = int(os.environ.get("CAREER_FLOW_RESUME_TOKEN_BUDGET", "1500"))
+
+@st.cache_resource
+def get_render_cache() -> RenderCache:
+    """Rendered PDFs by canonical YAML hash; available without starting the render workers."""
+    return RenderCache(
+        os.environ.get("CAREER_FLOW_RENDER_CACHE_DIR", os.path.join(".cache", "renders")),
+        max_memory_entries=int(os.environ.get("CAREER_FLOW_RENDER_CACHE_MEMORY_ENTRIES", "32")),
+        max_disk_entries=int(os.environ.get("CAREER_FLOW_RENDER_CACHE_DISK_ENTRIES", "500")),
+    )
 
-class SocialNetwork(BaseModel):
-    network: str
-    username: str = Field(..., description="Username for the social network (do not add the whole URL)")
-
-class CV(BaseModel):
-    name: str
-    location: str
-    email: Optional[str] = None
-    phone: Optional[str] = Field(
-        ..., 
-        pattern=r"^\+?[1-9]\d{1,14}$",
-        description="Phone number in E.164 format (e.g., +15555555555)"
+@st.cache_resource
+def get_render_service() -> RenderService:
+    """Process-wide pool of warm RenderCV workers shared across Streamlit sessions."""
+    return RenderService(
+        max_workers=int(os.environ.get("CAREER_FLOW_RENDER_WORKERS", "2")),
+        timeout=float(os.environ.get("CAREER_FLOW_RENDER_TIMEOUT", "60")),
+        max_queue_depth=int(os.environ.get("CAREER_FLOW_RENDER_QUEUE_DEPTH", "8")),
+        cache=get_render_cache(),
+    )
+
+@st.cache_resource
+def get_artifact_store() -> ArtifactStore:
+    """Content-addressed store for PDFs and resume text; sessions keep only the hashes."""
+    return ArtifactStore(
+        os.environ.get("CAREER_FLOW_ARTIFACT_DIR", os.path.join(".cache", "artifacts")),
+        max_bytes=int(os.environ.get("CAREER_FLOW_ARTIFACT_MAX_BYTES", str(512 * 2**20))),
+        max_age_seconds=float(os.environ.get("CAREER_FLOW_ARTIFACT_MAX_AGE", str(24 * 3600))),
+        sweep_interval=float(os.environ.get("CAREER_FLOW_ARTIFACT_SWEEP_INTERVAL", "300")),
+    )
+
+EXTRACT_WORKERS = int(os.environ.get("CAREER_FLOW_EXTRACT_WORKERS", "4"))
+
+@st.cache_resource
+def get_extraction_pool() -> ProcessPoolExecutor:
+    """Process pool for page-parallel extraction of large resume PDFs."""
+    return ProcessPoolExecutor(
+        max_workers=EXTRACT_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
     )
-    website: Optional[HttpUrl] = None
-    social_networks: Optional[List[SocialNetwork]] = None
-    sections: 'Sections'
-
-class ExperienceEntry(BaseModel):
-    company: str
-    position: str
-    location: Optional[str] = None
-    start_date: Optional[str] = Field(default=None, description="Start date in YYYY-MM format")
-    end_date: Optional[str] = Field(default=None, description="End date in YYYY-MM or 'present' format")
-    highlights: List[str] = Field(..., description="List of action-oriented highlights for the role. Quantify achievements where possible. Tailor these to the job description.")
-
-class EducationEntry(BaseModel):
-    institution: str
-    area: str
-    degree: Optional[str] = None
-    location: Optional[str] = None
-    start_date: Optional[str] = Field(default=None, description="Start date in YYYY-MM format")
-    end_date: Optional[str] = Field(default=None, description="End date in YYYY-MM format")
-    highlights: Optional[List[str]] = Field(default=None, description="List of highlights or relevant coursework. Tailor these to the job description. Don't include if not applicable.")
-
-
-class OneLineEntry(BaseModel):
-    label: str
-    details: str
-
-# Personal Project Entry Model
-class PersonalProjectEntry(BaseModel):
-    name: str
-    description: str = Field(..., description="Brief description of the project, including technologies used and impact.")
-    url: Optional[HttpUrl] = Field(default=None, description="Link to the project (GitHub, website, etc.)")
-    highlights: Optional[List[str]] = Field(default=None, description="Key achievements or features. Tailor these to the job description.")
-
-class PublicationsEntry(BaseModel):
-    title: str
-    authors: List[str]
-    doi: Optional[str] = None
-    journal: str
-    date: Optional[str] = Field(default=None, description="Publication date in YYYY format")
-    url: HttpUrl
-
-class Sections(BaseModel):
-    Summary: List[str] = Field(..., description="A 2-3 sentence professional summary, tailored to the job description, split into a list of strings.")
-    Skills: List[OneLineEntry]
-    Education: List[EducationEntry]
-    Experience: List[ExperienceEntry]
-    Publications: List[PublicationsEntry]
-    PersonalProjects: Optional[List[PersonalProjectEntry]] = Field(default=None, description="List of personal projects relevant to the job. Each entry should highlight technologies, impact, and relevance.")
-
-# This is required for Pydantic v1/v2 compatibility for forward references.
-CV.model_rebuild()
-Sections.model_rebuild()
-
-def _build_prompt(resume: str, job_desc: str) -> str:
-    """Construct the system/user prompt with strict instructions.
-
-    The prompt enforces:
-    - Schema compliance
-    - No hallucination
-    - Irrelevant content filtering
-    - Highlight merging/splitting guidelines
-    """
-
-    return f"""
-**Role**: You are a world-class professional resume writer and career-coach AI. Your mission is to transform a generic resume into a highly-tailored, compelling CV optimized for a specific job description.
-
-**Objective**: Produce **one** JSON object that conforms **exactly** to the provided Pydantic and rendercv (v2) schema.
-
----
-**Non-Negotiable Constraints**
-1. **Schema Fidelity** - Output **must** be valid JSON matching the `CV` model (no extra keys).
-2. **No Hallucination** - Omit any detail not present in the resume. If a field is missing, leave it out.
-3. **Relevancy Filter** - Include *only* experience, skills, education, and personal projects that directly or indirectly support the job description. Drop the rest.
-4. **Highlights Hygiene** -
-   - Split overly long or compound highlights into concise bullets (≤2 lines each).
-   - Each Experience can have up to 4 highlights for recent roles and 3 for older roles.
-   - Each Personal Project can have up to 3 highlights, focused on technologies, impact, and relevance to the job.
-5. **Action Verbs & Metrics** - Start bullets with strong verbs (e.g., "Led", "Architected") and quantify impact when possible (e.g., "Increased efficiency by 30%," "Managed a team of 5"). 
-6. **Markdown Emphasis** - Bold (`**`) any keyword that *exactly* matches a skill or responsibility from the job description (in `highlights`, `summary`, and `personal projects`).
-7. **Date Format** - Use YYYY-MM, YYYY, or "present" exactly as defined in the schema.
-8. **Username Extraction** - Return only usernames for social links (e.g., GitHub, LinkedIn).
-9. **Single-Page Target** - Keep the final CV to about **one page** (≈500-600 words when rendered). Trim or omit less critical details to fit including old experiences, non-relevant skills, and other extraneous information.
-
----
-**Step-by-Step Process (internal - do not output)**
-1. **Analyse Inputs** - Identify the 5-7 most critical keywords/skills from the Job Description that are strongly relevant to the user's background. Map resume content to those.
-2. **Synthesise Content** -
-   - **Summary** - 2-3 sentences (≤3 lines totally) that pitch the candidate using those keywords.
-   - **Experience** - Rewrite recent roles; keep or remove older ones based on relevance. Ensure highlights follow Constraint 4 and overall length supports the single-page goal.
-   - **Skills** - Present only relevant skills, grouped under clear labels. Add missing JD keywords (**bolded**) if absent in resume but seems suitable.
-   - **Education** - Generally does not need any highlights. Only include entries when they directly strengthen candidacy for the role.
-   - **Personal Projects** - Include personal projects that demonstrate relevant skills, technologies, or impact. Focus on those most relevant to the job description. Personal projects is an optional section, so if no relevant projects exist, this section can be omitted.
-3. **Assemble JSON** - Populate the `CV` object and return *only* the JSON.
-
----
-**Resume Content**:
-{resume}
----
-**Job Description**:
-{job_desc}
----
-"""
-
-def get_completion(resume_content, job_description_content, api_key):
-    # Patch the client with instructor
-    client = instructor.patch(OpenAI(api_key=api_key))
-
-    prompt = _build_prompt(resume_content, job_description_content)
-    try:
-        # Use the response_model parameter to get structured output
-        cv_instance = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a career-coach AI that returns JSON structured according to the provided Pydantic schema."},
-                {"role": "user", "content": prompt}
-            ],
-            response_model=CV,
-        )
-        # The response is already a Pydantic object, so we convert it to a dict
-        return cv_instance.model_dump()
-    except ValidationError as e:
-        st.error("AI response did not match the required data structure:")
-        st.error(e)
-        return None
-    except Exception as e:
-        st.error(f"An unexpected error occurred: {e}")
-        return None
 
-# Cover Letter Generation Function
-def generate_cover_letter(yaml_resume: str, job_description: str, api_key: str) -> str:
-    """
-    Generate a tailored cover letter using OpenAI, given the YAML resume and job description.
-    Returns the cover letter text or None on error.
-    """
-    client = OpenAI(api_key=api_key)
-    prompt = f"""
-You are a world-class professional resume writer and career-coach AI. Your mission is to write a compelling, tailored cover letter for a job application.
-
-**Instructions:**
-1. Use the provided resume data (YAML format) and job description to craft a cover letter.
-2. The cover letter should be highly relevant, concise (max 350 words), and highlight the candidate's fit for the role.
-3. Use a professional, engaging tone. Do not hallucinate details not present in the resume.
-4. Address the letter to the appropriate role/company if possible (extract from job description).
-5. Output only the cover letter text, no formatting or extra commentary.
-
----
-**Resume YAML:**
-{yaml_resume}
----
-**Job Description:**
-{job_description}
----
-"""
+@st.cache_data(max_entries=64, show_spinner=False)
+def extract_resume_text(pdf_hash: str, _pdf_bytes: bytes) -> str:
+    """Extract resume text once per distinct upload; reruns hit the cache by content hash."""
+    with tracing.span("pdf_extraction", bytes=len(_pdf_bytes)):
+        return extract_pdf_text(_pdf_bytes, executor=get_extraction_pool(), workers=EXTRACT_WORKERS)
+
+def run_tailor_job(payload, progress):
+    """Background "tailor" job: generate the CV dict in the requested generation mode."""
+    resume_input, job_input, api_key = payload["resume"], payload["job_description"], payload["api_key"]
+    with collect_errors() as errors:
+        if payload.get("use_profile"):
+            # Parsed once per resume; each job then sends only the entries relevant to it.
+            profile = get_master_profile(resume_input, api_key)
+            if profile is None:
+                raise RuntimeError("\n".join(errors) or "Parsing your master profile failed.")
+            with tracing.span("profile_selection"):
+                resume_input = profile_text(select_relevant(profile, job_input))
+        if payload["mode"] == "Streaming":
+            last_progress = 0.0
+
+            def report_partial(partial_cv):
+                nonlocal last_progress
+                # Throttle progress writes; every streamed token would otherwise rewrite the job row.
+                if time.monotonic() - last_progress >= 0.5:
+                    last_progress = time.monotonic()
+                    progress(build_cv_yaml(partial_cv))
+
+            resume_data = stream_completion(resume_input, job_input, api_key, report_partial)
+        elif payload["mode"] == "Parallel sections":
+            resume_data = get_completion_by_section(resume_input, job_input, api_key)
+        else:
+            resume_data = get_completion(resume_input, job_input, api_key)
+    if resume_data is None:
+        raise RuntimeError("\n".join(errors) or "Generation failed.")
+    if payload.get("cover_letter_job_description"):
+        # Start the cover letter now rather than after the user asks for it; the UI's own
+        # submission for the same input then attaches to this job through its dedup key.
+        cv_text = compact_cv_text(resume_data)
+        try:
+            get_job_queue().submit(
+                "cover_letter",
+                {"resume": cv_text, "job_description": payload["cover_letter_job_description"]},
+                secrets={"api_key": api_key},
+                dedup_key=cover_letter_key(cv_text, payload["cover_letter_job_description"]),
+            )
+        except JobQueueFull:
+            pass
+    return resume_data
+
+def cover_letter_key(cv_text, job_description):
+    return make_key("cover_letter", MODEL_NAME, cv_text, job_description)
+
+def run_cover_letter_job(payload, progress):
+    """Background "cover_letter" job."""
+    with collect_errors() as errors:
+        cover_letter = generate_cover_letter(payload["resume"], payload["job_description"], payload["api_key"])
+    if not cover_letter:
+        raise RuntimeError("\n".join(errors) or "Cover letter generation failed.")
+    return cover_letter
+
+def run_refine_job(payload, progress):
+    """Background "refine" job: the new value of one CV section or one Experience entry's highlights."""
+    with collect_errors() as errors:
+        value = regenerate_cv_part(payload["yaml_resume"], payload["job_description"], payload["api_key"],
+                                   payload["section"], payload["entry_index"], payload["instructions"])
+    if value is None:
+        raise RuntimeError("\n".join(errors) or "Section regeneration failed.")
+    return value
+
+def run_render_job(payload, progress):
+    """Background "render" job: artifact hash of the PDF for the edited YAML."""
     try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME,
-            messages=[
-                {"role": "system", "content": "You are a career-coach AI that writes tailored cover letters."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-        # Extract the cover letter text from the response
-        return response.choices[0].message.content.strip()
+        with tracing.span("render"):
+            return get_artifact_store().put(get_render_service().render(payload["yaml"]))
     except Exception as e:
-        st.error(f"An error occurred while generating the cover letter: {e}")
+        raise RuntimeError(f"An unexpected error occurred during PDF generation: {e}") from e
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """Process-wide background job queue; jobs outlive the script run (and session) that submitted them."""
+    queue = JobQueue(
+        os.environ.get("CAREER_FLOW_JOBS_DB", os.path.join(".cache", "jobs.sqlite3")),
+        max_workers=int(os.environ.get("CAREER_FLOW_JOB_WORKERS", "4")),
+        max_pending=int(os.environ.get("CAREER_FLOW_JOB_QUEUE_DEPTH", "16")),
+        retention_seconds=float(os.environ.get("CAREER_FLOW_JOB_RETENTION", str(24 * 3600))),
+    )
+    queue.register("tailor", run_tailor_job)
+    queue.register("cover_letter", run_cover_letter_job)
+    queue.register("render", run_render_job)
+    queue.register("refine", run_refine_job)
+    return queue
+
+def submit_job(kind, payload, secrets=None, dedup_key=None, reuse_finished=True):
+    """Submit a background job and remember its ID in the session (one job per kind)."""
+    try:
+        st.session_state.jobs[kind] = get_job_queue().submit(kind, payload, secrets, dedup_key, reuse_finished)
+    except JobQueueFull as e:
+        st.error(f"The server is busy: {e}")
+
+def finished_job(kind):
+    """Return the session's ``kind`` job once it has finished (showing its error if it failed), else None."""
+    job_id = st.session_state.jobs.get(kind)
+    if job_id is None:
+        return None
+    job = get_job_queue().get(job_id)
+    if job is not None and job["status"] in ACTIVE:
         return None
+    del st.session_state.jobs[kind]
+    if job is None:
+        st.error("The background job expired before its result was collected. Please try again.")
+        return None
+    # Show the job's stages in this run's timing debug panel.
+    for line in (job["trace"] or "").splitlines():
+        record = json.loads(line)
+        record.pop("trace_id", None)
+        trace.add(record)
+    if job["status"] == FAILED:
+        st.error(job["error"])
+    return job
+
+@st.fragment(run_every=1.0)
+def show_job_progress(kind, label):
+    """Poll the session's ``kind`` job; rerun the whole app once it has finished."""
+    job_id = st.session_state.jobs.get(kind)
+    job = get_job_queue().get(job_id) if job_id else None
+    if job is None or job["status"] not in ACTIVE:
+        st.rerun()
+    st.info(f"{label} ({job['status']}, {time.time() - job['created_at']:.0f}s)")
+    if job["progress"]:
+        st.code(job["progress"], language="yaml")
+
+def submit_cover_letter(job_description, api_key):
+    """Queue a cover letter for the current YAML, sent to the model as a compact projection."""
+    cv_text = cover_letter_resume(st.session_state.yaml_for_editing)
+    st.session_state.cover_letter = ""
+    st.session_state.cover_letter_source = make_key(st.session_state.yaml_for_editing)
+    submit_job(
+        "cover_letter",
+        {"resume": cv_text, "job_description": job_description},
+        secrets={"api_key": api_key},
+        dedup_key=cover_letter_key(cv_text, job_description),
+    )
+
+def set_generated_cv(cv_data):
+    st.session_state.output = cv_data
+    if cv_data:
+        with tracing.span("yaml_dump"):
+            st.session_state.yaml_for_editing = build_cv_yaml(cv_data)
+        st.session_state.pdf_artifact = None # Clear any previously generated PDF
+    else:
+        st.session_state.yaml_for_editing = ""
 
 st.title("Career Flow - AI Job Application Assistant")
 
+# Every script run records its own trace; see the debug panel at the bottom.
+trace = tracing.start_trace()
+
+cache_stats = get_response_cache().stats()
+st.sidebar.caption(f"Response cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses")
+render_cache_stats = get_render_cache().stats()
+st.sidebar.caption(f"Render cache: {render_cache_stats['hits']} hits / {render_cache_stats['misses']} misses")
+artifact_stats = get_artifact_store().stats()
+st.sidebar.caption(f"Artifact store: {artifact_stats['artifacts']} files / {artifact_stats['bytes'] / 2**20:.1f} MB")
+job_stats = get_job_queue().stats()
+st.sidebar.caption(f"Background jobs: {sum(job_stats.get(s, 0) for s in ACTIVE)} active / {job_stats.get(DONE, 0)} done")
+st.sidebar.caption(f"Local repairs: {cv_repair.STATS.repaired} ({cv_repair.STATS.retries_saved} LLM retries saved)")
+
 localS = LocalStorage()
 
 # Function to get and set API key in local storage
@@ -233,47 +270,73 @@ if api_key and (api_key != stored_api_key):
 
 if 'output' not in st.session_state:
     st.session_state.output = None
-if 'resume_text' not in st.session_state:
-    st.session_state.resume_text = ""
+if 'resume_artifact' not in st.session_state:
+    st.session_state.resume_artifact = None  # artifact hash of the resume text
 if 'yaml_for_editing' not in st.session_state:
     st.session_state.yaml_for_editing = ""
-if 'pdf_bytes' not in st.session_state:
-    st.session_state.pdf_bytes = None
+if 'pdf_artifact' not in st.session_state:
+    st.session_state.pdf_artifact = None  # artifact hash of the rendered PDF
+if 'cover_letter' not in st.session_state:
+    st.session_state.cover_letter = ""
+if 'jobs' not in st.session_state:
+    st.session_state.jobs = {}  # job kind -> background job ID, so reruns reattach to running work
 
 resume_file = st.file_uploader("Upload your resume (txt or pdf)", type=["txt", "pdf"])
 job_description = st.text_area("Paste the job description here")
+generation_mode = st.radio(
+    "Generation mode",
+    ["Streaming", "Single request", "Parallel sections"],
+    horizontal=True,
+    help="Streaming shows sections as they are written; Parallel sections generates each section concurrently and retries failed sections individually.",
+)
+compress_prompt = st.checkbox(
+    "Compress prompt",
+    value=False,
+    help="Strip job-description boilerplate and send only the resume content most relevant to it (computed locally).",
+)
+use_profile = st.checkbox(
+    "Use structured master profile",
+    value=False,
+    help="Parse your resume once into a complete structured profile (cached per resume), then send only its entries relevant to each job.",
+)
+draft_cover_letter = st.checkbox(
+    "Draft cover letter in the background",
+    value=False,
+    help="Start writing the cover letter as soon as the CV is ready, so it is waiting for you below. Editing the YAML afterwards marks it as outdated.",
+)
 
 if resume_file is not None:
     if resume_file.type == "application/pdf":
         try:
-            with fitz.open(stream=resume_file.read(), filetype="pdf") as doc:
-                full_content = []
-                for page in doc:
-                    # Extract text from the page
-                    full_content.append(page.get_text())
-                    
-                    # Extract URLs from links on the page
-                    links = page.get_links()
-                    for link in links:
-                        if "uri" in link and link["uri"]:
-                            full_content.append(link["uri"])
-                
-                st.session_state.resume_text = "\n".join(full_content)
+            pdf_bytes = resume_file.getvalue()
+            uploaded_text = extract_resume_text(content_hash(pdf_bytes), pdf_bytes)
         except Exception as e:
             st.error(f"Error reading PDF: {e}")
-            st.session_state.resume_text = ""
+            uploaded_text = ""
     else:
-        st.session_state.resume_text = resume_file.read().decode("utf-8")
-    
-    if st.session_state.resume_text:
-        with st.expander("Click to view the extracted resume text"):
-            st.text(st.session_state.resume_text)
+        uploaded_text = resume_file.read().decode("utf-8")
+    st.session_state.resume_artifact = get_artifact_store().put(uploaded_text) if uploaded_text else None
+
+resume_text = get_artifact_store().get_text(st.session_state.resume_artifact) or ""
+if resume_file is not None and resume_text:
+    with st.expander("Click to view the extracted resume text"):
+        st.text(resume_text)
 
 
 if st.button("Generate Tailored Application"):
     if not api_key:
         st.error("Please enter your OpenAI API key to proceed.")
-    elif st.session_state.resume_text and job_description:
+    elif resume_text and job_description:
+        resume_input, job_input = resume_text, job_description
+        if compress_prompt:
+            with tracing.span("prompt_compression"):
+                compressed = compress_inputs(resume_input, job_input, RESUME_TOKEN_BUDGET)
+            resume_input, job_input = compressed.resume, compressed.job_description
+            with st.expander(compressed.summary()):
+                st.markdown("**Top job keywords:** " + ", ".join(compressed.keywords[:15]))
+                if compressed.dropped_chunks:
+                    st.markdown("**Resume content left out:**")
+                    st.text("\n\n".join(compressed.dropped_chunks))
         if MOCK_TEST:
             with st.spinner("Generating your tailored application... (using mock data)"):
                 # For development: Use mock data from the YAML file
@@ -292,58 +355,51 @@ if st.button("Generate Tailored Application"):
                     st.error(f"Error loading mock data: {e}")
                     resume_data = None
 
-                st.session_state.output = resume_data
-        else:
-            with st.spinner("Generating your tailored application..."):
-                resume_data = get_completion(st.session_state.resume_text, job_description, api_key)
-                st.session_state.output = resume_data
-        
-        if st.session_state.output:
-            # Construct the full data structure for YAML
-            generated_cv_content = st.session_state.output
-            full_cv_data = {
-                "cv": generated_cv_content,
-                "design": {
-                    "theme": "engineeringresumes",
-                    "page": {
-                        "top_margin": "1cm",
-                        "bottom_margin": "1cm",
-                        "left_margin": "1cm",
-                        "right_margin": "1cm",
-                        "show_last_updated_date": False
-                    },
-                    "text": {
-                        "font_size": "10pt",
-                        "leading": "0.5em"
-                    },
-                    "header": {
-                        "horizontal_space_between_connections": "0.2cm",
-                    },
-                    "entries": {
-                        "vertical_space_between_entries": "0.8em",
-                        "date_and_location_width": "3.5cm"
-                    },
-                    "highlights": {
-                        "vertical_space_between_highlights": "0.2cm"
-                    }
-                },
-                "locale": {
-                    "language": "en"
-                }
-            }
-            st.session_state.yaml_for_editing = yaml.dump(full_cv_data, default_flow_style=False, sort_keys=False)
-            st.session_state.pdf_bytes = None # Clear any previously generated PDF
+                set_generated_cv(resume_data)
         else:
-            st.session_state.yaml_for_editing = ""
+            submit_job(
+                "tailor",
+                {"resume": resume_text if use_profile else resume_input,
+                 "job_description": job_input, "mode": generation_mode, "use_profile": use_profile,
+                 "cover_letter_job_description": job_description if draft_cover_letter else None},
+                secrets={"api_key": api_key},
+                # The payload differs with the draft option, so a finished run without a draft is not reused.
+                dedup_key=make_key(generation_mode, MODEL_NAME, CV_SCHEMA_VERSION, str(use_profile),
+                                   str(draft_cover_letter), resume_text if use_profile else resume_input, job_input),
+            )
     else:
         st.error("Please upload a resume and paste a job description.")
 
+tailor_job = finished_job("tailor")
+if tailor_job:
+    set_generated_cv(tailor_job["result"] if tailor_job["status"] == DONE else None)
+    if tailor_job["status"] == DONE and tailor_job["payload"].get("cover_letter_job_description") and api_key:
+        # Attaches to the cover letter job the tailor job already started.
+        submit_cover_letter(tailor_job["payload"]["cover_letter_job_description"], api_key)
+if "tailor" in st.session_state.jobs:
+    show_job_progress("tailor", "Generating your tailored application...")
+
 if st.session_state.yaml_for_editing:
     st.markdown("---")
     st.subheader("Edit Generated Resume Data (YAML)")
+
+    # Merge a finished section regeneration into the current YAML (edits made meanwhile are kept).
+    refine_job = finished_job("refine")
+    if refine_job and refine_job["status"] == DONE:
+        payload = refine_job["payload"]
+        try:
+            st.session_state.yaml_for_editing = merge_cv_part(
+                st.session_state.yaml_for_editing, payload["section"], refine_job["result"], payload["entry_index"],
+                payload.get("entry_key"),
+            )
+            st.session_state.pdf_artifact = None
+        except Exception as e:
+            st.error(f"Could not merge the regenerated {payload['section']} into the edited YAML: {e}")
     
     # Using a key helps Streamlit manage the state of this component better.
     # The code_editor component returns a dictionary with the edited text and button clicks.
+    from code_editor import code_editor
+
     response_dict = code_editor(
         st.session_state.yaml_for_editing,
         lang="yaml",
@@ -362,62 +418,84 @@ if st.session_state.yaml_for_editing:
     )
 
     # The component can return an empty text value on certain reruns.
-    # We only update the session state if the returned text is not empty.
-    if response_dict['text'] and response_dict['text'] != st.session_state.yaml_for_editing:
+    # We only update the session state if the returned text is not empty, and only for
+    # a new editor event, so a repeated stale event cannot undo a merged regeneration.
+    editor_event = response_dict.get('id')
+    if (response_dict['text'] and response_dict['text'] != st.session_state.yaml_for_editing
+            and (editor_event is None or editor_event != st.session_state.get('editor_event'))):
         st.session_state.yaml_for_editing = response_dict['text']
-        st.session_state.pdf_bytes = None # Clear old PDF on edit
-
-    # Check if the 'Generate PDF' button was clicked.
-    if response_dict['type'] == "submit":
-        with st.spinner("Generating PDF from edited YAML..."):
-            # Use the most up-to-date YAML from the session state
-            yaml_string = st.session_state.yaml_for_editing
-            if not yaml_string:
-                st.error("Cannot generate PDF from empty YAML. Please ensure there is content in the editor.")
-            else:
-                yaml_file_name = None
-                try:
-                    # 1. Create a temporary YAML file
-                    yaml_file_name = f"temp_cv_{uuid.uuid4()}.yaml"
-                    with open(yaml_file_name, 'w') as f:
-                        f.write(yaml_string)
-
-                    output_file_path = "tailored_resume.pdf"
-                    
-                    # 2. Run RenderCV's render command directly from Python
-                    cli_command_render(
-                        input_file_name=yaml_file_name,
-                        pdf_path=output_file_path,
-                        dont_generate_markdown=True,
-                        dont_generate_html=True,
-                        dont_generate_png=True
-                    )
-
-                    # 3. Check if the file was created and is not empty
-                    if os.path.exists(output_file_path) and os.path.getsize(output_file_path) > 0:
-                        with open(output_file_path, "rb") as pdf_file:
-                            st.session_state.pdf_bytes = pdf_file.read()
-                    else:
-                        st.error("PDF generation via CLI function failed. The output file is missing, empty, or corrupt.")
-                        st.session_state.pdf_bytes = None
-                        if os.path.exists(output_file_path):
-                            st.error(f"The file `{output_file_path}` was created but has a size of {os.path.getsize(output_file_path)} bytes.")
+        st.session_state.pdf_artifact = None # Clear old PDF on edit
+    st.session_state.editor_event = editor_event
+
+    # Check if the 'Generate PDF' button was clicked. The component repeats its last
+    # event on every rerun, so each click (event ID) is only submitted once.
+    render_event = response_dict.get('id')
+    if response_dict['type'] == "submit" and (render_event is None or render_event != st.session_state.get('render_event')):
+        st.session_state.render_event = render_event
+        # Use the most up-to-date YAML from the session state
+        yaml_string = st.session_state.yaml_for_editing
+        if not yaml_string:
+            st.error("Cannot generate PDF from empty YAML. Please ensure there is content in the editor.")
+        else:
+            # Finished renders are not reused: their PDF artifact may have been swept, and
+            # the render cache already makes repeats cheap.
+            submit_job("render", {"yaml": yaml_string}, dedup_key=render_cache_key(yaml_string), reuse_finished=False)
 
-                except Exception as e:
-                    st.error(f"An unexpected error occurred during PDF generation: {e}")
-                    st.session_state.pdf_bytes = None
-                finally:
-                    # 4. Clean up the temporary YAML file
-                    if yaml_file_name and os.path.exists(yaml_file_name):
-                        os.remove(yaml_file_name)
-    
-    # Display the PDF if it exists in the session state
-    if st.session_state.pdf_bytes:
+    render_job = finished_job("render")
+    if render_job:
+        st.session_state.pdf_artifact = render_job["result"] if render_job["status"] == DONE else None
+    if "render" in st.session_state.jobs:
+        show_job_progress("render", "Generating PDF from edited YAML...")
+
+    with st.expander("Regenerate a single section"):
+        try:
+            edited_sections = yaml.safe_load(st.session_state.yaml_for_editing)["cv"]["sections"]
+        except Exception:
+            edited_sections = {}
+        sections = [name for name in edited_sections if name in SECTION_MODELS]
+        if not sections:
+            st.caption("Fix the YAML above to regenerate individual sections.")
+        else:
+            section = st.selectbox("Section", sections)
+            entry_index = None
+            if section == "Experience" and edited_sections[section]:
+                entries = edited_sections[section]
+                entry_index = st.selectbox(
+                    "Part",
+                    [None, *range(len(entries))],
+                    format_func=lambda i: "Whole section" if i is None
+                    else f"Highlights: {entries[i].get('position')} at {entries[i].get('company')}",
+                )
+            instructions = st.text_input("Instructions (optional)", placeholder="e.g. make it more concise")
+            if st.button("Regenerate"):
+                if not api_key:
+                    st.error("Please enter your OpenAI API key to proceed.")
+                elif not job_description:
+                    st.error("A job description is required to regenerate a section.")
+                else:
+                    submit_job("refine", {
+                        "yaml_resume": st.session_state.yaml_for_editing, "job_description": job_description,
+                        "section": section, "entry_index": entry_index, "instructions": instructions,
+                        # The merge finds the entry by identity, in case entries are reordered or deleted meanwhile.
+                        "entry_key": None if entry_index is None else experience_entry_key(entries[entry_index]),
+                    }, secrets={"api_key": api_key})
+        if "refine" in st.session_state.jobs:
+            show_job_progress("refine", "Regenerating the selected section...")
+
+    # Display the PDF if it exists in the artifact store (it may have been swept since)
+    pdf_path = get_artifact_store().path(st.session_state.pdf_artifact) if st.session_state.pdf_artifact else None
+    if pdf_path and os.path.exists(pdf_path):
         st.subheader("Tailored Resume Preview")
-        pdf_viewer(st.session_state.pdf_bytes, width="100%", height=1000)
+        from streamlit_pdf_viewer import pdf_viewer
+
+        # Read from the file rather than holding the PDF in session state.
+        pdf_viewer(pdf_path, width="100%", height=1000)
+        # Deferred: the PDF is read from the store only when the button is clicked, not copied
+        # into the session's media storage on every rerun.
+        store, pdf_digest = get_artifact_store(), st.session_state.pdf_artifact
         st.download_button(
             label="Download Tailored Resume as PDF",
-            data=st.session_state.pdf_bytes,
+            data=lambda: store.get_bytes(pdf_digest) or b"",
             file_name="tailored_resume.pdf",
             mime="application/pdf"
         )
@@ -425,22 +503,58 @@ if st.session_state.yaml_for_editing:
     # --- Cover Letter Generation Section ---
     st.markdown("---")
     st.subheader("Generate Tailored Cover Letter")
-    if 'cover_letter' not in st.session_state:
-        st.session_state.cover_letter = ""
-
     if st.button("Generate Cover Letter"):
         if not api_key:
             st.error("Please enter your OpenAI API key to proceed.")
         elif not st.session_state.yaml_for_editing or not job_description:
             st.error("YAML resume and job description are required to generate a cover letter.")
         else:
-            with st.spinner("Generating your tailored cover letter..."):
-                cover_letter = generate_cover_letter(st.session_state.yaml_for_editing, job_description, api_key)
-                if cover_letter:
-                    st.session_state.cover_letter = cover_letter
-                else:
-                    st.session_state.cover_letter = ""
+            submit_cover_letter(job_description, api_key)
+
+    cover_letter_job = finished_job("cover_letter")
+    if cover_letter_job:
+        st.session_state.cover_letter = cover_letter_job["result"] if cover_letter_job["status"] == DONE else ""
+    if "cover_letter" in st.session_state.jobs:
+        show_job_progress("cover_letter", "Generating your tailored cover letter...")
 
     if st.session_state.cover_letter:
+        if st.session_state.get("cover_letter_source") != make_key(st.session_state.yaml_for_editing):
+            st.warning("The resume was edited after this cover letter was written. Click \"Generate Cover Letter\" to refresh it.")
         st.markdown("**Your Tailored Cover Letter:**")
-        st.text_area("Cover Letter", value=st.session_state.cover_letter, height=300)
\ No newline at end of file
+        st.text_area("Cover Letter", value=st.session_state.cover_letter, height=300)
+
+# --- Background Warm-Up ---
+@st.cache_resource
+def start_warm_up() -> threading.Thread:
+    """Once per process, after the first page is sent: import the heavy subsystems and start the render workers."""
+    def warm_up():
+        import fitz  # noqa: F401  (PDF uploads)
+        import instructor  # noqa: F401  (all LLM calls)
+        import clients  # noqa: F401
+        get_render_service()
+
+    thread = threading.Thread(target=warm_up, name="career-flow-warm-up", daemon=True)
+    thread.start()
+    return thread
+
+if os.environ.get("CAREER_FLOW_WARM_UP", "1") == "1":
+    start_warm_up()
+
+# --- Timing Debug Panel ---
+if trace.spans:
+    st.session_state.last_trace = trace
+    tracing.export(trace, os.environ.get("CAREER_FLOW_TRACE_JSONL"), os.environ.get("CAREER_FLOW_METRICS_PROM"))
+
+if st.sidebar.checkbox("Show timing debug panel"):
+    last_trace = st.session_state.get("last_trace")
+    if last_trace:
+        st.sidebar.markdown(f"**Last traced run** `{last_trace.trace_id}`")
+        st.sidebar.dataframe([
+            {"stage": span["name"], "parent": span["parent"], "ms": round(span["duration_ms"], 1),
+             **span["attributes"], "error": span.get("error")}
+            for span in last_trace.spans
+        ])
+        st.sidebar.download_button("Download trace (JSON lines)", last_trace.to_jsonl(), file_name="trace.jsonl")
+    else:
+        st.sidebar.caption("No traced stages yet. Generate an application or a PDF first.")
+    st.sidebar.download_button("Download metrics (Prometheus)", tracing.METRICS.prometheus_text(), file_name="metrics.prom")
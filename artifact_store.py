@@ -0,0 +1,132 @@
+"""Content-addressed on-disk store for session artifacts (rendered PDFs, resume text).
+
+Blobs are written once under their SHA-256 and read back through read-only
+memory maps, so Streamlit sessions keep only the hash in ``session_state``
+and identical artifacts are stored once across all sessions. A background
+sweeper evicts artifacts by age and keeps the store under a size limit.
+"""
+import hashlib
+import mmap
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+
+class ArtifactStore:
+    """Deduplicating blob store addressed by SHA-256.
+
+    Args:
+        directory: Where artifacts are written (sharded by the first two hex digits).
+        max_bytes: Least recently used artifacts are evicted beyond this total size.
+        max_age_seconds: Artifacts not used for this long are evicted.
+        sweep_interval: Seconds between background sweeps (0 disables the sweeper thread).
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 2**20, max_age_seconds: float = 24 * 3600,
+                 sweep_interval: float = 300.0):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Running totals for stats(), so it does not scan the store; every sweep re-counts.
+        files = list(self._files())
+        self._count, self._bytes = len(files), sum(size for _, _, size in files)
+        if sweep_interval > 0:
+            threading.Thread(target=self._sweep_forever, args=(sweep_interval,),
+                             name="artifact-sweeper", daemon=True).start()
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest)
+
+    def put(self, data: Union[bytes, str]) -> str:
+        """Store ``data`` (str is UTF-8 encoded) unless already present and return its hash."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        try:
+            # Already stored (possibly by another session): only mark it as recently used.
+            os.utime(path)
+            return digest
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        with self._lock:
+            if not os.path.exists(path):
+                self._count += 1
+                self._bytes += len(data)
+            os.replace(tmp_path, path)
+        return digest
+
+    @contextmanager
+    def open(self, digest: str) -> Iterator[Optional[mmap.mmap]]:
+        """Yield a read-only memory map of the artifact, or None if it is missing (or was swept)."""
+        try:
+            with open(self.path(digest), "rb") as f:
+                os.utime(f.fileno())
+                if os.fstat(f.fileno()).st_size == 0:
+                    yield memoryview(b"")
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    yield view
+        except FileNotFoundError:
+            yield None
+
+    def get_bytes(self, digest: Optional[str]) -> Optional[bytes]:
+        """Copy of the artifact for APIs that need ``bytes``, or None if it is missing."""
+        if not digest:
+            return None
+        with self.open(digest) as view:
+            return None if view is None else bytes(view)
+
+    def get_text(self, digest: Optional[str]) -> Optional[str]:
+        data = self.get_bytes(digest)
+        return None if data is None else data.decode("utf-8")
+
+    def _files(self):
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        yield entry.path, stat.st_mtime, stat.st_size
+
+    def sweep(self) -> int:
+        """Evict artifacts unused for ``max_age_seconds``, then the least recently used beyond ``max_bytes``."""
+        removed = 0
+        with self._lock:
+            now = time.time()
+            files = sorted(self._files(), key=lambda item: item[1])
+            total, count = sum(size for _, _, size in files), len(files)
+            for path, mtime, size in files:
+                if now - mtime <= self.max_age_seconds and total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+                count -= 1
+            self._count, self._bytes = count, total
+        return removed
+
+    def _sweep_forever(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                self.sweep()
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        """Artifact count and total size, kept up to date by ``put`` and ``sweep`` without scanning the store."""
+        with self._lock:
+            return {"artifacts": self._count, "bytes": self._bytes}
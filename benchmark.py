@@ -0,0 +1,233 @@
+"""Offline benchmark of the generation, extraction and rendering pipeline.
+
+Starts the local fake OpenAI server (see fake_openai_server.py), points the
+OpenAI SDK at it, and drives each stage over a corpus of resume/job
+description pairs, reporting p50/p95 latency, throughput and peak memory.
+
+    python benchmark.py --iterations 20 --concurrency 4 --latency 0.2 --tokens-per-second 400
+    python benchmark.py --output bench.json                        # save a baseline
+    python benchmark.py --baseline bench.json --tolerance 0.2      # fail on >20% p95 regression
+"""
+import argparse
+import json
+import math
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from fake_openai_server import DEFAULT_FIXTURE, FakeServerConfig, load_fixture_cv, start_server
+
+STAGES = ("get_completion", "stream_completion", "get_completion_by_section", "generate_cover_letter", "render", "extract_pdf")
+FAKE_API_KEY = "sk-benchmark"
+
+
+def load_corpus(path: Optional[str]) -> List[Tuple[str, str, Optional[bytes]]]:
+    """Load (resume text, job description, resume PDF bytes or None) triples.
+
+    ``path`` is a directory of sub-directories, each holding ``job_description.txt``
+    and ``resume.txt`` and/or ``resume.pdf``. Without a path, the repository's
+    sample resume.txt/job_description.txt pair is used.
+    """
+    if not path:
+        with open("resume.txt") as f, open("job_description.txt") as g:
+            return [(f.read(), g.read(), None)]
+    corpus = []
+    for name in sorted(os.listdir(path)):
+        pair_dir = os.path.join(path, name)
+        jd_path = os.path.join(pair_dir, "job_description.txt")
+        if not os.path.isfile(jd_path):
+            continue
+        with open(jd_path) as f:
+            job_description = f.read()
+        resume_text, pdf_bytes = "", None
+        if os.path.isfile(os.path.join(pair_dir, "resume.pdf")):
+            with open(os.path.join(pair_dir, "resume.pdf"), "rb") as f:
+                pdf_bytes = f.read()
+        if os.path.isfile(os.path.join(pair_dir, "resume.txt")):
+            with open(os.path.join(pair_dir, "resume.txt")) as f:
+                resume_text = f.read()
+        elif pdf_bytes is not None:
+            from pdf_extract import extract_pdf_text
+            resume_text = extract_pdf_text(pdf_bytes)
+        corpus.append((resume_text, job_description, pdf_bytes))
+    return corpus
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def run_stage(name: str, operation: Callable, inputs: list, concurrency: int) -> dict:
+    """Run ``operation`` over ``inputs`` with ``concurrency`` threads and summarise the timings.
+
+    An operation fails if it raises or returns None (the app's error convention).
+    Peak allocation is measured afterwards in a separate, untimed pass over one
+    batch of ``concurrency`` inputs, since tracemalloc's per-allocation overhead
+    would inflate the latencies.
+    """
+    latencies, errors = [], 0
+
+    def timed(item):
+        started = time.perf_counter()
+        try:
+            ok = operation(item) is not None
+        except Exception:
+            ok = False
+        return time.perf_counter() - started, ok
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for latency, ok in executor.map(timed, inputs):
+            latencies.append(latency)
+            errors += 0 if ok else 1
+    wall = time.perf_counter() - started
+
+    tracemalloc.start()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(timed, inputs[:concurrency]))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "stage": name,
+        "runs": len(inputs),
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "throughput_per_s": len(inputs) / wall if wall else 0.0,
+        "peak_alloc_mb": peak / 2**20,
+        # ru_maxrss is in KiB on Linux; it is a high-water mark for the whole process.
+        "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def compare(results: List[dict], baseline_path: str, tolerance: float) -> List[str]:
+    """Return a message for every stage whose p95 latency regressed beyond ``tolerance``."""
+    with open(baseline_path) as f:
+        baseline = {row["stage"]: row for row in json.load(f)["stages"]}
+    regressions = []
+    for row in results:
+        before = baseline.get(row["stage"])
+        if before and row["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{row['stage']}: p95 {before['p95_ms']:.1f} ms -> {row['p95_ms']:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Career Flow pipeline against a local fake OpenAI server.")
+    parser.add_argument("--corpus", help="Directory of resume/job description pairs (see load_corpus).")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated subset of: {', '.join(STAGES)}.")
+    parser.add_argument("--iterations", type=int, default=5, help="Passes over the corpus per stage.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Simultaneous operations per stage.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Fake server: seconds before each response.")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Fake server: generation throughput.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fake server: fraction of failing requests.")
+    parser.add_argument("--error-status", type=int, default=429, help="Fake server: HTTP status of injected failures.")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="RenderCV YAML whose 'cv' key is returned by the fake server.")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the response cache enabled (off by default so every call hits the server).")
+    parser.add_argument("--output", help="Write results as JSON (usable later as --baseline).")
+    parser.add_argument("--baseline", help="Results JSON to compare p95 latencies against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p95 regression vs. baseline (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    fixture_cv = load_fixture_cv(args.fixture)
+    server = start_server(FakeServerConfig(args.latency, args.tokens_per_second, args.error_rate,
+                                           args.error_status, fixture_cv))
+    # Configure before importing generation: the SDK and cache read these on first use.
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["CAREER_FLOW_CACHE_DIR"] = tempfile.mkdtemp(prefix="career_flow_bench_cache_")
+    if not args.with_cache:
+        os.environ["CAREER_FLOW_CACHE_MAX_ENTRIES"] = "0"
+
+    from streamlit.logger import set_log_level
+    from generation import generate_cover_letter, get_completion, get_completion_by_section, stream_completion
+    from models import build_cv_yaml
+    from prompts import cover_letter_resume
+
+    # st.error/st.cache_resource warn about the missing ScriptRunContext on every call outside `streamlit run`.
+    set_log_level("error")
+
+    corpus = load_corpus(args.corpus) * args.iterations
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    cv_yaml = build_cv_yaml(fixture_cv)
+    cover_letter_cv = cover_letter_resume(cv_yaml)  # what the app sends
+    rendered_pdfs = [pdf for _, _, pdf in corpus if pdf is not None]
+    results = []
+
+    # One untimed call so client creation and lazy SDK imports are not counted against the first sample.
+    if corpus and any(stage not in ("render", "extract_pdf") for stage in stages):
+        generate_cover_letter(cover_letter_cv, corpus[0][1], FAKE_API_KEY)
+
+    for stage in stages:
+        if stage == "get_completion":
+            results.append(run_stage(stage, lambda pair: get_completion(pair[0], pair[1], FAKE_API_KEY),
+                                     corpus, args.concurrency))
+        elif stage == "stream_completion":
+            results.append(run_stage(stage, lambda pair: stream_completion(pair[0], pair[1], FAKE_API_KEY, lambda _: None),
+                                     corpus, args.concurrency))
+        elif stage == "get_completion_by_section":
+            results.append(run_stage(stage, lambda pair: get_completion_by_section(pair[0], pair[1], FAKE_API_KEY),
+                                     corpus, args.concurrency))
+        elif stage == "generate_cover_letter":
+            results.append(run_stage(stage, lambda pair: generate_cover_letter(cover_letter_cv, pair[1], FAKE_API_KEY),
+                                     corpus, args.concurrency))
+        elif stage == "render":
+            try:
+                from render_service import RenderError, RenderService
+                service = RenderService(max_workers=max(1, args.concurrency), max_queue_depth=len(corpus) + 1)
+            except ImportError as e:
+                print(f"Skipping render: {e}", file=sys.stderr)
+                continue
+
+            def render(_):
+                pdf = service.render(cv_yaml)
+                rendered_pdfs.append(pdf)
+                return pdf
+
+            try:
+                # One untimed render so worker warm-up is not counted against the first sample.
+                service.render(cv_yaml)
+            except RenderError as e:
+                print(f"Skipping render: the warm-up render failed ({e})", file=sys.stderr)
+                service.shutdown()
+                continue
+            results.append(run_stage(stage, render, corpus, args.concurrency))
+            service.shutdown()
+        elif stage == "extract_pdf":
+            if not rendered_pdfs:
+                print("Skipping extract_pdf: no PDFs in the corpus and nothing rendered.", file=sys.stderr)
+                continue
+            from pdf_extract import extract_pdf_text
+            results.append(run_stage(stage, extract_pdf_text, rendered_pdfs[:len(corpus)], args.concurrency))
+        else:
+            parser.error(f"Unknown stage: {stage}")
+    server.shutdown()
+
+    header = f"{'stage':<28}{'runs':>6}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'ops/s':>9}{'peak MB':>9}{'RSS MB':>9}"
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(f"{row['stage']:<28}{row['runs']:>6}{row['errors']:>8}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+              f"{row['throughput_per_s']:>9.2f}{row['peak_alloc_mb']:>9.1f}{row['max_rss_mb']:>9.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"config": vars(args), "stages": results}, f, indent=2)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Headless bulk rendering of many CVs to PDF.
+
+Inputs are RenderCV YAML/JSON files in a directory, a JSON-lines file, or a
+stream on stdin (JSON lines or multi-document YAML). Bare CV dicts get the
+shared design/locale block (see models.build_cv_yaml); documents that bring
+their own ``design`` are rendered as they are. Rendering runs on a pool of
+warm RenderCV workers (see render_service.RenderService), and inputs whose
+content hash is already in the output's manifest are skipped.
+
+    python bulk_render.py cvs/ --output pdfs/
+    python bulk_render.py tailored.jsonl --zip campaign.zip --workers 4
+    cat cvs.jsonl | python bulk_render.py - --output pdfs/
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+import tracing
+from models import build_cv_yaml
+from render_service import RenderCache, RenderService, render_cache_key
+
+MANIFEST_NAME = "manifest.json"
+INPUT_SUFFIXES = (".yaml", ".yml", ".json")
+
+
+def _to_render_yaml(document) -> str:
+    if not isinstance(document, dict):
+        raise ValueError("expected a mapping (a CV or a RenderCV document)")
+    document = {k: v for k, v in document.items() if k != "id"}
+    if "cv" in document and ("design" in document or "locale" in document):
+        return yaml.dump(document, default_flow_style=False, sort_keys=False)
+    return build_cv_yaml(document.get("cv", document))
+
+
+def _parse_stream(text: str, name: str) -> List[Tuple[str, object]]:
+    """(id, document) pairs from JSON lines, or from (multi-document) YAML/JSON."""
+    if text.lstrip().startswith("{") and "\n{" in text.strip():
+        documents = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        documents = [doc for doc in yaml.safe_load_all(text) if doc is not None]
+    if len(documents) == 1:
+        return [(str(documents[0].get("id", name)) if isinstance(documents[0], dict) else name, documents[0])]
+    return [(str(doc.get("id", f"{name}-{i}")) if isinstance(doc, dict) else f"{name}-{i}", doc)
+            for i, doc in enumerate(documents, start=1)]
+
+
+def load_inputs(source: str) -> List[Tuple[str, object]]:
+    """Load (input id, document) pairs from a directory, a file, or ``-`` for stdin."""
+    if source == "-":
+        return _parse_stream(sys.stdin.read(), "stdin")
+    if os.path.isdir(source):
+        inputs = []
+        for name in sorted(os.listdir(source)):
+            path = os.path.join(source, name)
+            if os.path.isfile(path) and name.endswith(INPUT_SUFFIXES):
+                with open(path, "r") as f:
+                    inputs += _parse_stream(f.read(), os.path.splitext(name)[0])
+        return inputs
+    with open(source, "r") as f:
+        return _parse_stream(f.read(), os.path.splitext(os.path.basename(source))[0])
+
+
+def _safe_filename(input_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", input_id).strip("._") or "cv"
+
+
+class Output:
+    """Destination for rendered PDFs and the manifest: a directory or a zip archive.
+
+    Entries from a previous run's manifest are kept (PDFs included), so their
+    content hashes can be skipped, unless their input is rendered again with
+    different content (see ``retire``).
+    """
+
+    def __init__(self, directory: Optional[str] = None, zip_path: Optional[str] = None):
+        self.directory, self.zip_path = directory, zip_path
+        self.previous: Dict[str, dict] = {}
+        self._retired: List[str] = []
+        self._claimed = set()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            manifest_path = os.path.join(directory, MANIFEST_NAME)
+            if os.path.exists(manifest_path):
+                with open(manifest_path) as f:
+                    self._load_previous(json.load(f))
+        else:
+            self._tmp_path = f"{zip_path}.tmp"
+            if os.path.exists(zip_path):
+                with zipfile.ZipFile(zip_path) as old:
+                    if MANIFEST_NAME in old.namelist():
+                        self._load_previous(json.loads(old.read(MANIFEST_NAME)))
+            self._zip = zipfile.ZipFile(self._tmp_path, "w", zipfile.ZIP_DEFLATED)
+
+    def _load_previous(self, manifest: dict) -> None:
+        for entry in manifest.get("entries", []):
+            if entry.get("pdf") and entry["status"] in ("rendered", "skipped") and self._exists(entry["pdf"]):
+                self.previous[entry["key"]] = entry
+
+    def retire(self, current: List[Tuple[str, str]]) -> None:
+        """Drop previous entries of inputs that are in ``current`` ((input id, key) pairs) with other content.
+
+        Their names become free for the new render, and PDFs not overwritten are removed on ``close``.
+        """
+        keys_by_input: Dict[str, set] = {}
+        for input_id, key in current:
+            keys_by_input.setdefault(input_id, set()).add(key)
+        for key, entry in list(self.previous.items()):
+            if entry.get("input") in keys_by_input and key not in keys_by_input[entry["input"]]:
+                del self.previous[key]
+                self._retired.append(entry["pdf"])
+
+    def _exists(self, name: str) -> bool:
+        if self.directory:
+            return os.path.exists(os.path.join(self.directory, name))
+        with zipfile.ZipFile(self.zip_path) as old:
+            return name in old.namelist()
+
+    def pdf_name(self, input_id: str, key: str) -> str:
+        """``<input id>.pdf``, or ``<input id>-<hash>.pdf`` if another input of this run or a kept entry has it."""
+        name = f"{_safe_filename(input_id)}.pdf"
+        if name in self._claimed or any(entry["pdf"] == name for entry in self.previous.values()):
+            name = f"{_safe_filename(input_id)}-{key[:8]}.pdf"
+        self._claimed.add(name)
+        return name
+
+    def write_pdf(self, name: str, pdf_bytes: bytes) -> None:
+        if self.directory:
+            with open(os.path.join(self.directory, name), "wb") as f:
+                f.write(pdf_bytes)
+        else:
+            self._zip.writestr(name, pdf_bytes)
+
+    def close(self, manifest: dict) -> None:
+        text = json.dumps(manifest, indent=2)
+        if self.directory:
+            with open(os.path.join(self.directory, MANIFEST_NAME), "w") as f:
+                f.write(text)
+            for name in set(self._retired) - self._claimed:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+        else:
+            if self.previous:
+                with zipfile.ZipFile(self.zip_path) as old:
+                    for entry in self.previous.values():
+                        if entry["pdf"] not in self._claimed:
+                            self._zip.writestr(entry["pdf"], old.read(entry["pdf"]))
+                            self._claimed.add(entry["pdf"])
+            self._zip.writestr(MANIFEST_NAME, text)
+            self._zip.close()
+            os.replace(self._tmp_path, self.zip_path)
+
+    def discard(self) -> None:
+        """Remove the partial archive of a run that did not reach ``close`` (no-op otherwise)."""
+        if not self.directory:
+            self._zip.close()
+            try:
+                os.remove(self._tmp_path)
+            except FileNotFoundError:
+                pass
+
+
+def bulk_render(inputs: List[Tuple[str, object]], output: Output, service: RenderService, workers: int) -> dict:
+    """Render every input not already in ``output`` and return the manifest (also written to ``output``)."""
+    started = time.perf_counter()
+    entries, prepared, pending, seen = [], [], [], {}
+    for input_id, document in inputs:
+        try:
+            yaml_string = _to_render_yaml(document)
+        except ValueError as e:
+            entries.append({"input": input_id, "key": None, "pdf": None, "status": "failed", "seconds": 0.0,
+                            "error": str(e)})
+            continue
+        prepared.append((input_id, render_cache_key(yaml_string), yaml_string))
+    # An edited input replaces its earlier PDF instead of being added next to it.
+    output.retire([(input_id, key) for input_id, key, _ in prepared])
+
+    for input_id, key, yaml_string in prepared:
+        if key in output.previous or key in seen:
+            # Already rendered by an earlier run, or an identical input earlier in this one.
+            entry = output.previous.get(key) or seen[key]
+            entries.append({"input": input_id, "key": key, "pdf": entry["pdf"], "status": "skipped",
+                            "seconds": 0.0, "error": None})
+            continue
+        seen[key] = {"pdf": output.pdf_name(input_id, key)}
+        pending.append((input_id, key, seen[key]["pdf"], yaml_string))
+
+    def render(item):
+        input_id, key, pdf_name, yaml_string = item
+        item_started = time.perf_counter()
+        with tracing.span("bulk_render", input=input_id):
+            pdf_bytes = service.render(yaml_string)
+        return pdf_bytes, time.perf_counter() - item_started
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(render, item): item for item in pending}
+        for done, future in enumerate(as_completed(futures), start=1):
+            input_id, key, pdf_name, _ = futures[future]
+            try:
+                pdf_bytes, seconds = future.result()
+                output.write_pdf(pdf_name, pdf_bytes)
+                entries.append({"input": input_id, "key": key, "pdf": pdf_name, "status": "rendered",
+                                "seconds": round(seconds, 3), "error": None})
+                print(f"[{done}/{len(pending)}] {input_id}: {pdf_name} in {seconds:.2f} s")
+            except Exception as e:
+                entries.append({"input": input_id, "key": key, "pdf": None, "status": "failed", "seconds": 0.0,
+                                "error": str(e)})
+                print(f"[{done}/{len(pending)}] {input_id}: failed ({e})")
+
+    counts = {status: sum(1 for e in entries if e["status"] == status) for status in ("rendered", "skipped", "failed")}
+    # Keep earlier runs' PDFs in the manifest so the next run can still skip them.
+    current_keys = {entry["key"] for entry in entries}
+    entries += [entry for key, entry in output.previous.items() if key not in current_keys]
+    manifest = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        **counts,
+        "entries": entries,
+    }
+    output.close(manifest)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render many CVs (YAML/JSON files, JSON lines or stdin) to PDF.")
+    parser.add_argument("source", help="Directory of .yaml/.yml/.json files, a JSON-lines/YAML file, or - for stdin.")
+    destination = parser.add_mutually_exclusive_group(required=True)
+    destination.add_argument("--output", help="Directory for the PDFs and manifest.json.")
+    destination.add_argument("--zip", help="Zip archive for the PDFs and manifest.json.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Render worker processes.")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds allowed per render.")
+    parser.add_argument("--cache-dir", help="Also reuse/populate the app's render cache in this directory.")
+    parser.add_argument("--trace-jsonl", help="Append per-stage timing spans to this JSON-lines file.")
+    parser.add_argument("--metrics-prom", help="Write per-stage metrics to this file in Prometheus text format.")
+    args = parser.parse_args()
+
+    trace = tracing.start_trace()
+    try:
+        inputs = load_inputs(args.source)
+        cache = RenderCache(args.cache_dir) if args.cache_dir else None
+        service = RenderService(max_workers=args.workers, timeout=args.timeout, max_queue_depth=args.workers,
+                                cache=cache)
+        output = Output(args.output, args.zip)
+        try:
+            manifest = bulk_render(inputs, output, service, args.workers)
+        finally:
+            service.shutdown()
+            output.discard()
+    finally:
+        tracing.export(trace, args.trace_jsonl, args.metrics_prom)
+
+    print(f"Rendered {manifest['rendered']}, skipped {manifest['skipped']}, failed {manifest['failed']} "
+          f"of {len(inputs)} inputs in {manifest['wall_seconds']:.1f} s -> {args.output or args.zip}")
+    if manifest["failed"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
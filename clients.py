@@ -0,0 +1,92 @@
+"""Process-wide registry of OpenAI/instructor clients that share one keep-alive connection pool."""
+import hashlib
+import threading
+import time
+
+import httpx
+import instructor
+from openai import DefaultHttpxClient, OpenAI
+
+import tracing
+
+
+def _on_completion_response(response) -> None:
+    tracing.add_usage(getattr(response, "usage", None))
+
+
+def _on_parse_error(error) -> None:
+    # Every validation failure makes instructor re-ask the model.
+    tracing.add("retries")
+
+
+def _instructor_client(client: OpenAI):
+    """Wrap ``client`` with instructor and report token usage and retries to the active span.
+
+    from_openai re-asks up to 3 times on validation errors by default, where instructor.patch made a
+    single attempt; callers pass ``max_retries=1`` to keep the single attempt.
+    """
+    wrapped = instructor.from_openai(client)
+    wrapped.on("completion:response", _on_completion_response)
+    wrapped.on("parse:error", _on_parse_error)
+    return wrapped
+
+
+class ClientRegistry:
+    """Hands out OpenAI and instructor clients per API key.
+
+    Clients are keyed by a SHA-256 of the API key (the raw key is never used as a
+    dictionary key) and all of them send requests through a single shared httpx
+    client, so TLS connections are reused across calls and Streamlit sessions.
+
+    Args:
+        max_connections: Upper bound on open connections in the shared pool.
+        max_keepalive_connections: Idle connections kept open for reuse.
+        keepalive_expiry: Seconds an idle connection stays in the pool.
+        timeout: Read/write timeout in seconds for API requests.
+        connect_timeout: Timeout in seconds for establishing a connection.
+        idle_seconds: Clients unused for this long are dropped from the registry.
+    """
+
+    def __init__(self, max_connections: int = 20, max_keepalive_connections: int = 10,
+                 keepalive_expiry: float = 60.0, timeout: float = 120.0, connect_timeout: float = 10.0,
+                 idle_seconds: float = 1800.0):
+        self.idle_seconds = idle_seconds
+        self._http_client = DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        )
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, api_key: str) -> dict:
+        key = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            for stale in [k for k, e in self._clients.items() if now - e["last_used"] > self.idle_seconds]:
+                # Evicted clients are only dereferenced: closing them would close the shared pool.
+                del self._clients[stale]
+            entry = self._clients.get(key)
+            if entry is None:
+                entry = self._clients[key] = {
+                    "openai": OpenAI(api_key=api_key, http_client=self._http_client),
+                    # instructor patches create in place, so it gets its own wrapper.
+                    "instructor": _instructor_client(OpenAI(api_key=api_key, http_client=self._http_client)),
+                }
+            entry["last_used"] = now
+            return entry
+
+    def openai(self, api_key: str) -> OpenAI:
+        """Plain OpenAI client for ``api_key``."""
+        return self._entry(api_key)["openai"]
+
+    def instructor(self, api_key: str) -> instructor.Instructor:
+        """instructor client for ``api_key`` (supports ``response_model``)."""
+        return self._entry(api_key)["instructor"]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
@@ -0,0 +1,213 @@
+"""Local, deterministic repair of LLM output before validation.
+
+Common schema misses (phone formatting, URLs without a scheme, dates such as
+"Jan 2020", full profile URLs instead of usernames, unknown keys) are fixed in
+place so instructor only re-asks the model for errors that remain afterwards.
+"""
+import re
+import threading
+from typing import Any, List, Tuple, Type, Union, get_args, get_origin
+from urllib.parse import parse_qs, urlparse
+
+from pydantic import BaseModel, ConfigDict, HttpUrl, ValidationError, model_validator
+
+import tracing
+
+MONTHS = {name: i for i, names in enumerate([
+    ("jan", "january"), ("feb", "february"), ("mar", "march"), ("apr", "april"), ("may",), ("jun", "june"),
+    ("jul", "july"), ("aug", "august"), ("sep", "sept", "september"), ("oct", "october"), ("nov", "november"),
+    ("dec", "december"),
+], start=1) for name in names}
+PRESENT = {"present", "current", "currently", "now", "ongoing", "to date", "today"}
+
+
+class RepairStats:
+    """Process-wide counters of local repairs and the LLM retries they avoided."""
+
+    def __init__(self):
+        self.repaired = 0
+        self.retries_saved = 0
+        self._lock = threading.Lock()
+
+    def record(self, saved_retry: bool) -> None:
+        with self._lock:
+            self.repaired += 1
+            self.retries_saved += 1 if saved_retry else 0
+        if saved_retry:
+            tracing.add("retries_saved")
+
+
+STATS = RepairStats()
+
+
+def normalize_phone(value: Any) -> Any:
+    """'+1 (555) 555-5555', '001 555 555 5555' -> '+15555555555'; '+44 (0) 20 7946 0958' -> '+442079460958'."""
+    if not isinstance(value, str):
+        return value
+    text = re.sub(r"\s*(ext\.?|x)\s*\d+\s*$", "", value.strip(), flags=re.IGNORECASE)
+    # The national trunk prefix written after a country code is not dialled internationally.
+    text = re.sub(r"^((?:\+|00)\s*\d{1,3})\s*\(0\)", r"\1", text)
+    digits = re.sub(r"\D", "", text)
+    if not digits:
+        return None
+    if text.startswith("00"):
+        return "+" + digits[2:]
+    return ("+" if text.startswith("+") else "") + digits
+
+
+def normalize_url(value: Any) -> Any:
+    """Add a missing scheme and strip whitespace; empty strings become None."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip().strip("<>")
+    if not text:
+        return None
+    if not re.match(r"^[a-z][a-z0-9+.-]*://", text, re.IGNORECASE):
+        text = "https://" + text.lstrip("/")
+    return text
+
+
+def normalize_date(value: Any) -> Any:
+    """Canonicalize to YYYY-MM, YYYY or 'present'."""
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    lowered = text.lower().rstrip(".")
+    if lowered in PRESENT:
+        return "present"
+    match = re.fullmatch(r"(\d{4})[-/.](\d{1,2})(?:[-/.]\d{1,2})?", text)
+    if match:
+        return f"{match[1]}-{int(match[2]):02d}"
+    match = re.fullmatch(r"(\d{1,2})[-/.](\d{4})", text)
+    if match:
+        return f"{match[2]}-{int(match[1]):02d}"
+    match = re.fullmatch(r"([a-z]+)\.?,?\s+(\d{4})", lowered)
+    if match and match[1] in MONTHS:
+        return f"{match[2]}-{MONTHS[match[1]]:02d}"
+    return text
+
+
+def normalize_username(value: Any) -> Any:
+    """'https://github.com/user/' -> 'user', 'linkedin.com/in/user' -> 'user', '@user' -> 'user',
+    'scholar.google.com/citations?user=ID' -> 'ID'.
+
+    URLs with any other query string are left as they are.
+    """
+    if not isinstance(value, str):
+        return value
+    text = value.strip()
+    if "/" in text or re.match(r"^(www\.)?[\w-]+\.[a-z]{2,}/", text, re.IGNORECASE):
+        url = urlparse(normalize_url(text))
+        if url.query:
+            query = parse_qs(url.query)
+            return next((query[name][0] for name in ("user", "id") if query.get(name)), text)
+        segments = [s for s in url.path.split("/") if s]
+        # linkedin.com/in/<user>, x.com/<user>, github.com/<user>/<repo> -> <user>
+        if len(segments) > 1 and segments[0] in ("in", "pub", "u", "user", "users"):
+            segments = segments[1:]
+        if segments:
+            text = segments[0]
+    return text.lstrip("@")
+
+
+FIELD_REPAIRS = {
+    "phone": normalize_phone,
+    "start_date": normalize_date,
+    "end_date": normalize_date,
+    "date": normalize_date,
+    "username": normalize_username,
+}
+
+
+def _unwrap(annotation) -> Tuple[Any, bool, bool]:
+    """Return (inner type, is_list, is_url) for annotations like Optional[List[Model]]."""
+    is_list = False
+    while True:
+        origin = get_origin(annotation)
+        if origin is Union:
+            args = [a for a in get_args(annotation) if a is not type(None)]
+            annotation = args[0] if len(args) == 1 else annotation
+            if len(args) != 1:
+                break
+        elif origin in (list, List):
+            is_list = True
+            annotation = get_args(annotation)[0]
+        else:
+            break
+    return annotation, is_list, annotation is HttpUrl
+
+
+def repair_data(model: Type[BaseModel], data: Any, path: str = "") -> Tuple[Any, List[str]]:
+    """Return a repaired copy of ``data`` for ``model`` and a description of each change."""
+    if not isinstance(data, dict):
+        return data, []
+    repairs, repaired = [], {}
+    for key, value in data.items():
+        location = f"{path}{key}"
+        field = model.model_fields.get(key)
+        if field is None:
+            repairs.append(f"dropped unknown key {location}")
+            continue
+        inner, is_list, is_url = _unwrap(field.annotation)
+        fix = FIELD_REPAIRS.get(key) or (normalize_url if is_url else None)
+        if isinstance(inner, type) and issubclass(inner, BaseModel):
+            if is_list and isinstance(value, list):
+                new_value = []
+                for i, item in enumerate(value):
+                    item, item_repairs = repair_data(inner, item, f"{location}[{i}].")
+                    new_value.append(item)
+                    repairs += item_repairs
+            else:
+                new_value, nested = repair_data(inner, value, f"{location}.")
+                repairs += nested
+        elif fix is not None:
+            new_value = [fix(v) for v in value] if is_list and isinstance(value, list) else fix(value)
+            if new_value != value:
+                repairs.append(f"normalized {location}: {value!r} -> {new_value!r}")
+        else:
+            new_value = value
+        repaired[key] = new_value
+    return repaired, repairs
+
+
+def _repair_and_count(model: Type[BaseModel], data: Any) -> Any:
+    """Repair ``data`` and count a saved retry when only the repaired version validates."""
+    repaired, repairs = repair_data(model, data)
+    if not repairs:
+        return data
+    try:
+        model.model_validate(data)
+        saved_retry = False
+    except ValidationError:
+        try:
+            model.model_validate(repaired)
+            saved_retry = True
+        except ValidationError:
+            saved_retry = False
+    STATS.record(saved_retry)
+    return repaired
+
+
+def validate_with_repair(model: Type[BaseModel], data: Any) -> BaseModel:
+    """Repair ``data`` locally, then validate it as ``model`` (raising if still invalid)."""
+    return model.model_validate(_repair_and_count(model, data))
+
+
+def with_repair(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Subclass ``model`` so local repair runs before validation, e.g. as an instructor response_model.
+
+    The subclass keeps the original name and schema title, so the model sees
+    the same tool/schema. If data is still invalid after repair, validation
+    fails as usual and instructor re-asks only about the remaining errors.
+    """
+
+    class Repaired(model):
+        model_config = ConfigDict(title=model.__name__)
+
+        @model_validator(mode="before")
+        @classmethod
+        def _repair_before_validation(cls, data: Any) -> Any:
+            return _repair_and_count(model, data)
+
+    Repaired.__name__ = Repaired.__qualname__ = model.__name__
+    return Repaired
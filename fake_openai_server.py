@@ -0,0 +1,233 @@
+"""Local OpenAI-compatible stand-in server for offline benchmarks.
+
+Implements ``POST /v1/chat/completions`` (plain, tool-calling and streaming
+responses) with configurable latency, token throughput and error injection.
+Structured-output requests are answered from a fixture CV, shaped to whatever
+response schema the caller sends, so the full CV model, per-section
+sub-models and partial streaming all validate.
+
+Run standalone with ``python fake_openai_server.py --port 8001`` and point the
+app at it with ``OPENAI_BASE_URL=http://127.0.0.1:8001/v1``.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+
+import yaml
+
+DEFAULT_FIXTURE = "temp_cv_c0bd7810-aa7c-44dc-aa2a-7a00ecc587dd.yaml"
+COVER_LETTER = (
+    "Dear Hiring Manager,\n\nI am excited to apply for this role. My experience building and shipping "
+    "production systems maps directly onto the responsibilities you describe, and I would welcome the "
+    "chance to bring that experience to your team.\n\nSincerely,\nThe Candidate"
+)
+
+
+@dataclass
+class FakeServerConfig:
+    """Behaviour of the fake server.
+
+    Args:
+        latency: Seconds before the first byte of every response.
+        tokens_per_second: Simulated generation throughput (0 = instant).
+        error_rate: Fraction of requests that fail with ``error_status``.
+        error_status: HTTP status used for injected errors (429 or 5xx).
+        cv: Fixture CV dict used to answer structured-output requests.
+    """
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 429
+    cv: dict = field(default_factory=dict)
+
+
+def load_fixture_cv(path: str = DEFAULT_FIXTURE) -> dict:
+    with open(path, "r") as f:
+        return yaml.safe_load(f)["cv"]
+
+
+def _fill_schema(schema: dict, cv: dict) -> dict:
+    """Answer a response schema with the matching top-level, section or entry fields of the fixture CV."""
+    sections = cv.get("sections", {})
+    # Single-entry regeneration asks for bare highlights; answer with the first experience's.
+    entry = (sections.get("Experience") or [{}])[0]
+    answer = {}
+    for name in schema.get("properties", {}):
+        value = cv.get(name, sections.get(name, entry.get(name)))
+        if value is not None:
+            answer[name] = value
+    return answer
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server: "FakeOpenAIServer"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: dict, headers: Optional[dict] = None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        config = self.server.config
+        time.sleep(config.latency)
+        if random.random() < config.error_rate:
+            self._send_json(
+                config.error_status,
+                {"error": {"message": "Injected failure from fake server", "type": "fake_error"}},
+                {"Retry-After": "0"},
+            )
+            return
+
+        tool_name, output = self._answer(request, config)
+        usage = {
+            "prompt_tokens": _estimate_tokens(json.dumps(request.get("messages", []))),
+            "completion_tokens": _estimate_tokens(output),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if request.get("stream"):
+            self._stream(request, config, tool_name, output, usage)
+        else:
+            if config.tokens_per_second:
+                time.sleep(usage["completion_tokens"] / config.tokens_per_second)
+            self._send_json(200, self._completion(request, tool_name, output, usage))
+
+    @staticmethod
+    def _answer(request: dict, config: FakeServerConfig) -> Tuple[Optional[str], str]:
+        """Return (tool name or None, generated text or tool arguments)."""
+        if request.get("tools"):
+            function = request["tools"][0]["function"]
+            return function["name"], json.dumps(_fill_schema(function.get("parameters", {}), config.cv))
+        response_format = request.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            return None, json.dumps(_fill_schema(response_format["json_schema"].get("schema", {}), config.cv))
+        return None, COVER_LETTER
+
+    @staticmethod
+    def _message(tool_name: Optional[str], output: str) -> dict:
+        if tool_name:
+            return {"role": "assistant", "content": None, "tool_calls": [
+                {"id": "call_0", "type": "function", "function": {"name": tool_name, "arguments": output}}
+            ]}
+        return {"role": "assistant", "content": output}
+
+    def _completion(self, request: dict, tool_name: Optional[str], output: str, usage: dict) -> dict:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": self._message(tool_name, output),
+                "finish_reason": "tool_calls" if tool_name else "stop",
+            }],
+            "usage": usage,
+        }
+
+    def _stream(self, request: dict, config: FakeServerConfig, tool_name: Optional[str], output: str, usage: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def send(delta: dict, finish_reason: Optional[str] = None, **extra):
+            chunk = {
+                "id": "chatcmpl-stream",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "fake"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        if tool_name:
+            send({"role": "assistant", "tool_calls": [
+                {"index": 0, "id": "call_0", "type": "function", "function": {"name": tool_name, "arguments": ""}}
+            ]})
+        else:
+            send({"role": "assistant", "content": ""})
+        piece_chars = 16  # ~4 tokens per chunk
+        for start in range(0, len(output), piece_chars):
+            piece = output[start:start + piece_chars]
+            if config.tokens_per_second:
+                time.sleep(_estimate_tokens(piece) / config.tokens_per_second)
+            if tool_name:
+                send({"tool_calls": [{"index": 0, "function": {"arguments": piece}}]})
+            else:
+                send({"content": piece})
+        send({}, "tool_calls" if tool_name else "stop", usage=usage)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: FakeServerConfig):
+        super().__init__(address, FakeOpenAIHandler)
+        self.config = config
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+
+def start_server(config: FakeServerConfig, host: str = "127.0.0.1", port: int = 0) -> FakeOpenAIServer:
+    """Start the fake server on a background thread (port 0 picks a free port)."""
+    server = FakeOpenAIServer((host, port), config)
+    threading.Thread(target=server.serve_forever, name="fake-openai-server", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local OpenAI-compatible fake server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response starts.")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Simulated throughput (0 = instant).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail.")
+    parser.add_argument("--error-status", type=int, default=429, help="HTTP status for injected failures.")
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE, help="RenderCV YAML whose 'cv' key answers CV requests.")
+    args = parser.parse_args()
+
+    config = FakeServerConfig(args.latency, args.tokens_per_second, args.error_rate, args.error_status,
+                              load_fixture_cv(args.fixture))
+    server = FakeOpenAIServer((args.host, args.port), config)
+    print(f"Fake OpenAI server listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
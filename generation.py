@@ -0,0 +1,268 @@
+"""LLM-backed CV and cover letter generation.
+
+These functions are shared by the Streamlit app, background jobs and the
+offline benchmark; errors are reported with ``st.error`` (or collected, see
+``collect_errors``) and signalled by returning None.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, List, Optional
+
+import streamlit as st
+import yaml
+from pydantic import ValidationError
+
+import tracing
+from cv_repair import validate_with_repair, with_repair
+from master_profile import parse_master_profile
+from models import CV, CV_SCHEMA_VERSION, for_streaming
+from prompts import build_cover_letter_prompt, build_cv_prompt, cv_messages
+from response_cache import ResponseCache, make_key
+from section_engine import generate_cv_by_section, regenerate_part
+
+if TYPE_CHECKING:
+    from clients import ClientRegistry
+
+MODEL_NAME = os.environ.get("OPENAI_MODEL", "gpt-4o")
+# Repairs phone/URL/date/username slips locally before instructor would re-ask the model.
+RepairedCV = with_repair(CV)
+# Partially streamed URLs and phone numbers do not pass CV's checks yet, so streaming validates loosely.
+StreamingCV = for_streaming(CV)
+_error_sink: ContextVar[Optional[List[str]]] = ContextVar("career_flow_errors", default=None)
+
+def report_error(message) -> None:
+    """``st.error``, unless running inside ``collect_errors`` (e.g. in a background job)."""
+    sink = _error_sink.get()
+    if sink is None:
+        st.error(message)
+    else:
+        sink.append(str(message))
+
+@contextmanager
+def collect_errors():
+    """Collect error messages into the yielded list instead of showing them with ``st.error``."""
+    errors = []
+    token = _error_sink.set(errors)
+    try:
+        yield errors
+    finally:
+        _error_sink.reset(token)
+
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache shared across Streamlit sessions and reruns."""
+    return ResponseCache(
+        os.environ.get("CAREER_FLOW_CACHE_DIR", os.path.join(".cache", "responses")),
+        max_entries=int(os.environ.get("CAREER_FLOW_CACHE_MAX_ENTRIES", "500")),
+        max_age_seconds=float(os.environ.get("CAREER_FLOW_CACHE_MAX_AGE", str(7 * 24 * 3600))),
+    )
+
+@st.cache_resource
+def get_client_registry() -> "ClientRegistry":
+    """OpenAI/instructor clients shared across Streamlit sessions, with one keep-alive connection pool."""
+    # openai/instructor are the slowest imports in the app, so they load with the first client.
+    from clients import ClientRegistry
+
+    print(f"Using OpenAI model: {MODEL_NAME}")
+    return ClientRegistry(
+        max_connections=int(os.environ.get("CAREER_FLOW_HTTP_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(os.environ.get("CAREER_FLOW_HTTP_MAX_KEEPALIVE", "10")),
+        timeout=float(os.environ.get("CAREER_FLOW_HTTP_TIMEOUT", "120")),
+        idle_seconds=float(os.environ.get("CAREER_FLOW_CLIENT_IDLE_SECONDS", "1800")),
+    )
+
+@st.cache_resource
+def get_profile_store() -> ResponseCache:
+    """Parsed master profiles by resume content hash; kept much longer than ordinary responses."""
+    return ResponseCache(
+        os.environ.get("CAREER_FLOW_PROFILE_DIR", os.path.join(".cache", "profiles")),
+        max_entries=int(os.environ.get("CAREER_FLOW_PROFILE_MAX_ENTRIES", "1000")),
+        max_age_seconds=float(os.environ.get("CAREER_FLOW_PROFILE_MAX_AGE", str(90 * 24 * 3600))),
+    )
+
+def get_master_profile(resume_content, api_key):
+    """The resume parsed into a complete, untailored CV dict; parsed once per distinct resume text."""
+    store = get_profile_store()
+    cache_key = make_key("profile", MODEL_NAME, CV_SCHEMA_VERSION, resume_content)
+    cached = store.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        profile = parse_master_profile(get_client_registry().instructor(api_key), MODEL_NAME, resume_content)
+        store.set(cache_key, profile)
+        return profile
+    except ValidationError as e:
+        report_error("AI response did not match the required data structure:")
+        report_error(e)
+        return None
+    except Exception as e:
+        report_error(f"An unexpected error occurred while parsing your master profile: {e}")
+        return None
+
+def get_completion(resume_content, job_description_content, api_key):
+    with tracing.span("prompt_build"):
+        prompt = build_cv_prompt(resume_content, job_description_content)
+    cache = get_response_cache()
+    cache_key = make_key("cv", MODEL_NAME, CV_SCHEMA_VERSION, prompt)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Shared instructor client for this API key
+    client = get_client_registry().instructor(api_key)
+    try:
+        # Use the response_model parameter to get structured output
+        with tracing.span("llm_cv", model=MODEL_NAME):
+            cv_instance = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=cv_messages(prompt),
+                response_model=RepairedCV,
+                max_retries=1,
+            )
+        # The response is already a Pydantic object, so we convert it to a dict
+        cv_data = cv_instance.model_dump(mode="json")
+        cache.set(cache_key, cv_data)
+        return cv_data
+    except ValidationError as e:
+        report_error("AI response did not match the required data structure:")
+        report_error(e)
+        return None
+    except Exception as e:
+        report_error(f"An unexpected error occurred: {e}")
+        return None
+
+def stream_completion(resume_content, job_description_content, api_key, on_partial):
+    """Like get_completion, but calls ``on_partial`` with a partial CV dict as sections stream in.
+
+    Partial CVs are only loosely validated; the full CV/Sections validation runs
+    once, on the final object, after the stream completes.
+    """
+    with tracing.span("prompt_build"):
+        prompt = build_cv_prompt(resume_content, job_description_content)
+    cache = get_response_cache()
+    cache_key = make_key("cv", MODEL_NAME, CV_SCHEMA_VERSION, prompt)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        on_partial(cached)
+        return cached
+
+    import instructor
+
+    client = get_client_registry().instructor(api_key)
+    try:
+        partial_cv = None
+        with tracing.span("llm_cv_stream", model=MODEL_NAME) as stream_span:
+            for partial_cv in client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=cv_messages(prompt),
+                response_model=instructor.Partial[StreamingCV],
+                stream=True,
+                max_retries=1,
+            ):
+                if "first_partial_ms" not in stream_span["attributes"]:
+                    stream_span["attributes"]["first_partial_ms"] = (time.time() - stream_span["start"]) * 1000
+                on_partial(partial_cv.model_dump(mode="json", exclude_none=True, warnings=False))
+        if partial_cv is None:
+            report_error("The AI response stream ended without any content.")
+            return None
+        with tracing.span("cv_validation"):
+            cv_data = validate_with_repair(CV, partial_cv.model_dump(mode="json", warnings=False)).model_dump(mode="json")
+        cache.set(cache_key, cv_data)
+        return cv_data
+    except ValidationError as e:
+        report_error("AI response did not match the required data structure:")
+        report_error(e)
+        return None
+    except Exception as e:
+        report_error(f"An unexpected error occurred: {e}")
+        return None
+
+def get_completion_by_section(resume_content, job_description_content, api_key):
+    """Like get_completion, but generates each CV section concurrently (see section_engine)."""
+    cache = get_response_cache()
+    cache_key = make_key("cv_sections", MODEL_NAME, CV_SCHEMA_VERSION, build_cv_prompt(resume_content, job_description_content))
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        with tracing.span("llm_cv_sections", model=MODEL_NAME):
+            cv_data = generate_cv_by_section(
+                get_client_registry().instructor(api_key), MODEL_NAME, resume_content, job_description_content
+            )
+        cache.set(cache_key, cv_data)
+        return cv_data
+    except ValidationError as e:
+        report_error("AI response did not match the required data structure:")
+        report_error(e)
+        return None
+    except Exception as e:
+        report_error(f"An unexpected error occurred: {e}")
+        return None
+
+def regenerate_cv_part(yaml_resume, job_description, api_key, section, entry_index=None, instructions=""):
+    """Regenerate one section (or one Experience entry's highlights) of the edited YAML resume.
+
+    Returns the new value for that part, validated against its sub-model, or
+    None on error; merge it with models.merge_cv_part.
+    """
+    try:
+        cv_data = yaml.safe_load(yaml_resume)["cv"]
+    except (yaml.YAMLError, TypeError, KeyError) as e:
+        report_error(f"The edited YAML could not be read: {e}")
+        return None
+    cache = get_response_cache()
+    cache_key = make_key("cv_part", MODEL_NAME, CV_SCHEMA_VERSION, json.dumps(cv_data, sort_keys=True, default=str),
+                         job_description, section, str(entry_index), instructions)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    try:
+        value = regenerate_part(get_client_registry().instructor(api_key), MODEL_NAME, cv_data, job_description,
+                                section, entry_index, instructions)
+        cache.set(cache_key, value)
+        return value
+    except ValidationError as e:
+        report_error("AI response did not match the required data structure:")
+        report_error(e)
+        return None
+    except Exception as e:
+        report_error(f"An unexpected error occurred: {e}")
+        return None
+
+# Cover Letter Generation Function
+def generate_cover_letter(yaml_resume: str, job_description: str, api_key: str) -> str:
+    """
+    Generate a tailored cover letter using OpenAI, given the YAML resume and job description.
+    Returns the cover letter text or None on error.
+    """
+    prompt = build_cover_letter_prompt(yaml_resume, job_description)
+    cache = get_response_cache()
+    cache_key = make_key("cover_letter", MODEL_NAME, prompt)
+    cached = cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    client = get_client_registry().openai(api_key)
+    try:
+        with tracing.span("llm_cover_letter", model=MODEL_NAME):
+            response = client.chat.completions.create(
+                model=MODEL_NAME,
+                messages=[
+                    {"role": "system", "content": "You are a career-coach AI that writes tailored cover letters."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            tracing.add_usage(response.usage)
+        # Extract the cover letter text from the response
+        cover_letter = response.choices[0].message.content.strip()
+        cache.set(cache_key, cover_letter)
+        return cover_letter
+    except Exception as e:
+        report_error(f"An error occurred while generating the cover letter: {e}")
+        return None
@@ -0,0 +1,180 @@
+"""SQLite-backed background jobs, so generation and rendering survive Streamlit reruns.
+
+Work is submitted by kind ("tailor", "cover_letter", "render", ...) and runs on a
+bounded thread pool. Status, progress and results are kept in SQLite, so a
+rerun (or a new session) can poll a job by ID and pick up its result instead
+of starting the work again. Secrets such as API keys are passed to handlers in
+memory only and are never written to the database.
+"""
+import contextvars
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import tracing
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    dedup_key TEXT,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    progress TEXT,
+    result BLOB,
+    error TEXT,
+    trace TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_dedup ON jobs (kind, dedup_key);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+"""
+
+
+class JobQueueFull(RuntimeError):
+    """Raised by ``submit`` when the queue is at its admission limit."""
+
+
+class JobQueue:
+    """Bounded worker pool whose jobs are recorded in a SQLite database.
+
+    Handlers are registered per kind and called as ``handler(payload, progress)``,
+    where ``payload`` also holds the job's in-memory secrets and ``progress(value)``
+    stores a JSON-serializable progress snapshot. A handler's return value (JSON
+    data or bytes) becomes the job result; raising or returning None fails the job.
+
+    Args:
+        db_path: SQLite database file.
+        max_workers: Jobs executed at the same time.
+        max_pending: Queued plus running jobs allowed before ``submit`` rejects new work.
+        retention_seconds: Finished jobs older than this are deleted.
+    """
+
+    def __init__(self, db_path: str, max_workers: int = 4, max_pending: int = 16,
+                 retention_seconds: float = 24 * 3600):
+        self.db_path = db_path
+        self.max_pending = max_pending
+        self.retention_seconds = retention_seconds
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, Callable] = {}
+        self._secrets: Dict[str, dict] = {}
+        # Fingerprints of active jobs' secrets (in memory only), so only callers with the same secrets reattach.
+        self._fingerprints: Dict[str, str] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="career-flow-job")
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            # Jobs from a previous process lost their worker thread (and their in-memory secrets).
+            self._db.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE status IN (?, ?)",
+                (FAILED, "Interrupted by a server restart.", time.time(), *ACTIVE),
+            )
+
+    def register(self, kind: str, handler: Callable[[dict, Callable[[Any], None]], Any]) -> None:
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, payload: dict, secrets: Optional[dict] = None,
+               dedup_key: Optional[str] = None, reuse_finished: bool = True) -> str:
+        """Queue a job and return its ID.
+
+        With ``dedup_key``, a queued or running job of the same kind and key started
+        with the same secrets, or (with ``reuse_finished``) a finished one, is returned
+        instead, so resubmitting identical work does not run it twice. A caller with
+        different secrets (e.g. another API key) never attaches to a job still running
+        with someone else's, since that job may fail on their credentials.
+        """
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind!r}")
+        now = time.time()
+        fingerprint = hashlib.sha256(json.dumps(secrets or {}, sort_keys=True).encode("utf-8")).hexdigest()
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE status IN (?, ?) AND finished_at < ?",
+                             (DONE, FAILED, now - self.retention_seconds))
+            if dedup_key is not None:
+                statuses = (*ACTIVE, DONE) if reuse_finished else ACTIVE
+                rows = self._db.execute(
+                    f"SELECT id, status FROM jobs WHERE kind = ? AND dedup_key = ? AND status IN ({', '.join('?' * len(statuses))}) "
+                    "ORDER BY created_at DESC",
+                    (kind, dedup_key, *statuses),
+                ).fetchall()
+                for row in rows:
+                    if row["status"] == DONE or self._fingerprints.get(row["id"]) == fingerprint:
+                        return row["id"]
+            pending = self._db.execute("SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", ACTIVE).fetchone()[0]
+            if pending >= self.max_pending:
+                raise JobQueueFull(f"{pending} jobs are already queued or running; try again shortly.")
+            job_id = uuid.uuid4().hex
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, dedup_key, status, payload, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, kind, dedup_key, QUEUED, json.dumps(payload), now),
+            )
+            self._secrets[job_id] = dict(secrets or {})
+            self._fingerprints[job_id] = fingerprint
+        # A fresh context per job keeps traces and other ContextVars from leaking between jobs.
+        self._executor.submit(contextvars.Context().run, self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        """Job record with decoded ``payload``, ``progress`` and ``result``, or None if unknown."""
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        job["progress"] = json.loads(job["progress"]) if job["progress"] is not None else None
+        if isinstance(job["result"], str):
+            job["result"] = json.loads(job["result"])
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Number of jobs per status."""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def _update(self, job_id: str, **columns) -> None:
+        assignments = ", ".join(f"{column} = ?" for column in columns)
+        with self._lock:
+            self._db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*columns.values(), job_id))
+
+    def _run(self, job_id: str) -> None:
+        job = self.get(job_id)
+        secrets = self._secrets.pop(job_id, {})
+        self._update(job_id, status=RUNNING, started_at=time.time())
+        trace = tracing.start_trace(job_id[:16])
+        try:
+            with tracing.span(f"job_{job['kind']}"):
+                result = self._handlers[job["kind"]](
+                    {**job["payload"], **secrets},
+                    lambda value: self._update(job_id, progress=json.dumps(value)),
+                )
+            if result is None:
+                raise RuntimeError(f"{job['kind']} job produced no result")
+            stored = result if isinstance(result, bytes) else json.dumps(result)
+            self._update(job_id, status=DONE, result=stored, trace=trace.to_jsonl(), finished_at=time.time())
+        except Exception as e:
+            self._update(job_id, status=FAILED, error=str(e) or type(e).__name__,
+                         trace=trace.to_jsonl(), finished_at=time.time())
+        finally:
+            # Only once the row is final: a running row without its fingerprint would let a duplicate through.
+            self._fingerprints.pop(job_id, None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._db.close()
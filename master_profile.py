@@ -0,0 +1,64 @@
+"""Structured master profile: the complete, untailored resume parsed once into the CV model.
+
+Tailoring then starts from a locally filtered projection of the profile
+instead of the raw resume text, so the model does not re-parse the same
+unstructured resume for every job description.
+"""
+import copy
+from typing import Dict
+
+from cv_repair import with_repair
+from models import CV
+from prompt_compression import bm25_scores, extract_keywords, strip_boilerplate
+from prompts import build_profile_prompt, compact_cv_text, cv_messages
+import tracing
+
+ProfileCV = with_repair(CV)
+# Most entries of each section sent to the tailoring call; other sections are sent whole.
+SECTION_LIMITS: Dict[str, int] = {"Experience": 6, "Education": 3, "Skills": 8, "PersonalProjects": 4, "Publications": 4}
+
+
+def parse_master_profile(client, model: str, resume: str) -> dict:
+    """Parse ``resume`` into a CV dict that keeps every entry (one LLM call)."""
+    with tracing.span("llm_profile", model=model):
+        profile = client.chat.completions.create(
+            model=model,
+            messages=cv_messages(build_profile_prompt(resume)),
+            response_model=ProfileCV,
+            max_retries=1,
+        )
+    return profile.model_dump(mode="json")
+
+
+def _entry_text(value) -> str:
+    if isinstance(value, dict):
+        return " ".join(_entry_text(v) for v in value.values())
+    if isinstance(value, list):
+        return " ".join(_entry_text(v) for v in value)
+    return "" if value is None else str(value)
+
+
+def select_relevant(profile: dict, job_desc: str, limits: Dict[str, int] = SECTION_LIMITS) -> dict:
+    """Copy of ``profile`` with each limited section cut to its entries most relevant to ``job_desc``.
+
+    Entries are scored locally with BM25 against the job description's keywords.
+    Up to ``limits[section]`` entries with a positive score are kept in their
+    original order; if none match, the first (usually most recent) entry is kept.
+    """
+    keywords = extract_keywords(strip_boilerplate(job_desc) or job_desc)
+    selected = copy.deepcopy(profile)
+    sections = selected.get("sections") or {}
+    for name, limit in limits.items():
+        entries = sections.get(name)
+        if not entries:
+            continue
+        scores = bm25_scores([_entry_text(entry) for entry in entries], keywords)
+        ranked = [i for i in sorted(range(len(entries)), key=lambda i: scores[i], reverse=True) if scores[i] > 0]
+        keep = set(ranked[:limit]) or {0}
+        sections[name] = [entry for i, entry in enumerate(entries) if i in keep]
+    return selected
+
+
+def profile_text(profile: dict) -> str:
+    """Compact YAML of a (selected) profile for the tailoring prompt; links are kept for the CV header."""
+    return compact_cv_text(profile, dropped_keys=())
@@ -0,0 +1,173 @@
+"""Pydantic models for the RenderCV structure.
+
+These models define the exact structure RenderCV expects.
+"""
+import copy
+import hashlib
+import json
+from typing import List, Optional, Union, get_args, get_origin
+
+import yaml
+from pydantic import BaseModel, Field, HttpUrl, create_model
+
+class SocialNetwork(BaseModel):
+    network: str
+    username: str = Field(..., description="Username for the social network (do not add the whole URL)")
+
+class CV(BaseModel):
+    name: str
+    location: str
+    email: Optional[str] = None
+    phone: Optional[str] = Field(
+        ..., 
+        pattern=r"^\+?[1-9]\d{1,14}$",
+        description="Phone number in E.164 format (e.g., +15555555555)"
+    )
+    website: Optional[HttpUrl] = None
+    social_networks: Optional[List[SocialNetwork]] = None
+    sections: 'Sections'
+
+class ExperienceEntry(BaseModel):
+    company: str
+    position: str
+    location: Optional[str] = None
+    start_date: Optional[str] = Field(default=None, description="Start date in YYYY-MM format")
+    end_date: Optional[str] = Field(default=None, description="End date in YYYY-MM or 'present' format")
+    highlights: List[str] = Field(..., description="List of action-oriented highlights for the role. Quantify achievements where possible. Tailor these to the job description.")
+
+class EducationEntry(BaseModel):
+    institution: str
+    area: str
+    degree: Optional[str] = None
+    location: Optional[str] = None
+    start_date: Optional[str] = Field(default=None, description="Start date in YYYY-MM format")
+    end_date: Optional[str] = Field(default=None, description="End date in YYYY-MM format")
+    highlights: Optional[List[str]] = Field(default=None, description="List of highlights or relevant coursework. Tailor these to the job description. Don't include if not applicable.")
+
+
+class OneLineEntry(BaseModel):
+    label: str
+    details: str
+
+# Personal Project Entry Model
+class PersonalProjectEntry(BaseModel):
+    name: str
+    description: str = Field(..., description="Brief description of the project, including technologies used and impact.")
+    url: Optional[HttpUrl] = Field(default=None, description="Link to the project (GitHub, website, etc.)")
+    highlights: Optional[List[str]] = Field(default=None, description="Key achievements or features. Tailor these to the job description.")
+
+class PublicationsEntry(BaseModel):
+    title: str
+    authors: List[str]
+    doi: Optional[str] = None
+    journal: str
+    date: Optional[str] = Field(default=None, description="Publication date in YYYY format")
+    url: HttpUrl
+
+class Sections(BaseModel):
+    Summary: List[str] = Field(..., description="A 2-3 sentence professional summary, tailored to the job description, split into a list of strings.")
+    Skills: List[OneLineEntry]
+    Education: List[EducationEntry]
+    Experience: List[ExperienceEntry]
+    Publications: List[PublicationsEntry]
+    PersonalProjects: Optional[List[PersonalProjectEntry]] = Field(default=None, description="List of personal projects relevant to the job. Each entry should highlight technologies, impact, and relevance.")
+
+# This is required for Pydantic v1/v2 compatibility for forward references.
+CV.model_rebuild()
+Sections.model_rebuild()
+
+# Changes whenever the CV schema changes, so cached responses for an older schema are never reused.
+CV_SCHEMA_VERSION = hashlib.sha256(json.dumps(CV.model_json_schema(), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+# Shared RenderCV design/locale block appended to every generated CV.
+RENDERCV_DESIGN = {
+    "theme": "engineeringresumes",
+    "page": {
+        "top_margin": "1cm",
+        "bottom_margin": "1cm",
+        "left_margin": "1cm",
+        "right_margin": "1cm",
+        "show_last_updated_date": False
+    },
+    "text": {
+        "font_size": "10pt",
+        "leading": "0.5em"
+    },
+    "header": {
+        "horizontal_space_between_connections": "0.2cm",
+    },
+    "entries": {
+        "vertical_space_between_entries": "0.8em",
+        "date_and_location_width": "3.5cm"
+    },
+    "highlights": {
+        "vertical_space_between_highlights": "0.2cm"
+    }
+}
+RENDERCV_LOCALE = {
+    "language": "en"
+}
+
+def build_cv_yaml(cv_data: dict) -> str:
+    """Wrap CV data with the RenderCV design/locale block and dump it as editable YAML."""
+    full_cv_data = {"cv": cv_data, "design": RENDERCV_DESIGN, "locale": RENDERCV_LOCALE}
+    return yaml.dump(full_cv_data, default_flow_style=False, sort_keys=False)
+
+def experience_entry_key(entry: dict) -> dict:
+    """What identifies an Experience entry across edits: its company and position."""
+    return {"company": entry.get("company"), "position": entry.get("position")}
+
+def merge_cv_part(yaml_string: str, section: str, value, entry_index=None, entry_key=None) -> str:
+    """Replace one section (or one Experience entry's highlights) in a RenderCV YAML document.
+
+    Everything else, including the user's edits to other sections and the
+    design block, is kept as is. An entry is looked up by ``entry_key`` (see
+    experience_entry_key; ``entry_index`` only breaks ties between identical
+    entries), so entries reordered or deleted meanwhile never receive another
+    role's highlights. Raises ValueError if the entry no longer exists.
+    """
+    document = yaml.safe_load(yaml_string)
+    sections = document["cv"].setdefault("sections", {})
+    if entry_index is None:
+        sections[section] = value
+    else:
+        entries = sections.get(section) or []
+        if entry_key is not None:
+            matches = [i for i, entry in enumerate(entries)
+                       if isinstance(entry, dict) and experience_entry_key(entry) == entry_key]
+            if not matches:
+                raise ValueError(f"the {section} entry \"{entry_key.get('position')}\" at "
+                                 f"\"{entry_key.get('company')}\" is no longer in the YAML")
+            entry_index = entry_index if entry_index in matches else matches[0]
+        entries[entry_index]["highlights"] = value
+    return yaml.dump(document, default_flow_style=False, sort_keys=False)
+
+def for_streaming(model: type) -> type:
+    """Copy of ``model`` (and its nested models) that every partially received object passes.
+
+    ``HttpUrl`` fields become plain strings and field constraints (such as the
+    phone ``pattern``) are dropped, since a half-streamed "htt" or "+1 (555" would
+    otherwise abort the stream. The final object is still validated (and repaired) as ``CV``.
+    """
+    def relax(annotation):
+        if annotation is HttpUrl:
+            return str
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return for_streaming(annotation)
+        origin, args = get_origin(annotation), get_args(annotation)
+        if origin is Union:
+            return Union[tuple(relax(arg) for arg in args)]
+        if origin is list:
+            return List[relax(args[0])]
+        return annotation
+
+    def loosen(field):
+        field = copy.copy(field)
+        field.metadata = []
+        return field
+
+    return create_model(
+        model.__name__,
+        __doc__=model.__doc__,
+        **{name: (relax(field.annotation), loosen(field)) for name, field in model.model_fields.items()},
+    )
@@ -0,0 +1,53 @@
+"""Resume PDF text extraction, parallelised across pages for large documents."""
+import hashlib
+from concurrent.futures import Executor
+from typing import List, Optional
+
+
+# Documents shorter than this are extracted inline; process start-up would cost more than it saves.
+PARALLEL_PAGE_THRESHOLD = 8
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 hex digest used to memoize extraction by uploaded content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extract_pages(pdf_bytes: bytes, start: int, stop: int) -> List[str]:
+    """Extract text followed by link URIs for pages ``start``..``stop - 1``."""
+    import fitz  # PyMuPDF; imported on first use to keep app start-up fast
+
+    chunks = []
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        for page in doc.pages(start, stop):
+            # Extract text from the page
+            chunks.append(page.get_text())
+
+            # Extract URLs from links on the page
+            for link in page.get_links():
+                if "uri" in link and link["uri"]:
+                    chunks.append(link["uri"])
+    return chunks
+
+
+def extract_pdf_text(pdf_bytes: bytes, executor: Optional[Executor] = None, workers: int = 4) -> str:
+    """Return the text and link URIs of every page, in page order.
+
+    When an ``executor`` is given and the document is long enough, pages are split
+    into ``workers`` contiguous ranges that are extracted in parallel.
+    """
+    import fitz
+
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        page_count = doc.page_count
+
+    if executor is None or page_count < PARALLEL_PAGE_THRESHOLD:
+        return "\n".join(_extract_pages(pdf_bytes, 0, page_count))
+
+    step = -(-page_count // workers)  # ceiling division
+    futures = [
+        executor.submit(_extract_pages, pdf_bytes, start, min(start + step, page_count))
+        for start in range(0, page_count, step)
+    ]
+    # Results are gathered in submission order, which keeps page (and link) order intact.
+    return "\n".join(chunk for future in futures for chunk in future.result())
@@ -0,0 +1,192 @@
+"""Local (offline) prompt compression for the tailoring prompt.
+
+The job description is stripped of boilerplate (benefits, EEO statements,
+company history) and mined for ranked keywords; resume chunks are then scored
+against those keywords with BM25 and only the most relevant ones that fit the
+token budget are kept, in their original order.
+"""
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List
+
+STOPWORDS = frozenset("""
+a about above after again all also an and any are as at be because been being both but by can could did do does
+doing during each etc few for from further had has have having he her here hers him his how i if in into is it its
+itself just me more most my no nor not of off on once only or other our ours out over own per same she should so
+some such than that the their theirs them then there these they this those through to too under until up us very
+was we were what when where which while who whom why will with within without would you your yours
+ability able across work working team teams role candidate candidates including strong experience years year
+looking join new well must plus preferred required requirements responsibilities qualifications using use
+""".split())
+
+# Headings whose sections are dropped from the job description entirely.
+BOILERPLATE_HEADINGS = re.compile(
+    r"^\W*(benefits|perks|what we offer|why join|about (us|the company)|who we are|our (story|mission|values)|"
+    r"compensation|salary|equal (employment )?opportunity|eeo|diversity|accommodations?|privacy|disclaimer|"
+    r"how to apply|company overview)\b",
+    re.IGNORECASE,
+)
+# Individual paragraphs dropped wherever they appear.
+BOILERPLATE_PHRASES = re.compile(
+    r"equal opportunity employer|without regard to (race|age|religion)|reasonable accommodation|"
+    r"401\(?k\)?|paid time off|health(, dental)? (and|&) (dental|vision)|e-?verify|background check|"
+    r"applicant privacy|recruitment agencies|sexual orientation|protected veteran|disability status",
+    re.IGNORECASE,
+)
+HEADING = re.compile(r"^\s*(#+\s*\S.*|\*\*[^*]{1,60}\*\*:?|[A-Z][A-Za-z /&-]{1,40}:|[A-Z][A-Z /&-]{2,40})\s*$")
+TOKEN = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) that needs no tokenizer."""
+    return (len(text) + 3) // 4
+
+
+def _tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _paragraphs(text: str) -> List[str]:
+    return [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+
+
+def strip_boilerplate(job_desc: str) -> str:
+    """Remove boilerplate sections and paragraphs from a job description."""
+    kept, skipping = [], False
+    for paragraph in _paragraphs(job_desc):
+        first_line = paragraph.splitlines()[0]
+        if HEADING.match(first_line):
+            skipping = bool(BOILERPLATE_HEADINGS.match(first_line.strip("#*: ")))
+        if not skipping and not BOILERPLATE_PHRASES.search(paragraph):
+            kept.append(paragraph)
+    return "\n\n".join(kept)
+
+
+def extract_keywords(job_desc: str, top_n: int = 30) -> List[str]:
+    """Rank unigrams and bigrams in the job description by frequency, favouring bigrams."""
+    scores = Counter()
+    for line in job_desc.splitlines():
+        tokens = _tokenize(line)
+        scores.update(t for t in tokens if len(t) > 1)
+        # Adjacent content words such as "machine learning" carry more signal than either word alone.
+        scores.update({f"{a} {b}": 1.5 for a, b in zip(tokens, tokens[1:])})
+    return [term for term, _ in scores.most_common(top_n)]
+
+
+def split_resume(resume: str, max_words: int = 80) -> List[str]:
+    """Split resume text into chunks at headings and blank lines, capped at ``max_words`` each.
+
+    Headings stay attached to the chunk that follows them.
+    """
+    chunks, current, words = [], [], 0
+    for line in resume.splitlines():
+        line_words = len(line.split())
+        headings_only = all(HEADING.match(kept) for kept in current)
+        if current and not headings_only and (not line.strip() or HEADING.match(line) or words + line_words > max_words):
+            chunks.append("\n".join(current))
+            current, words = [], 0
+        if line.strip():
+            current.append(line)
+            words += line_words
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def bm25_scores(chunks: List[str], query: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Score each chunk against the query terms (unigrams and bigrams) with BM25."""
+    docs = []
+    for chunk in chunks:
+        tokens = _tokenize(chunk)
+        docs.append(Counter(tokens + [f"{a} {b_}" for a, b_ in zip(tokens, tokens[1:])]))
+    avg_len = sum(sum(d.values()) for d in docs) / len(docs) if docs else 0.0
+    scores = []
+    for doc in docs:
+        length = sum(doc.values())
+        score = 0.0
+        for term in query:
+            freq = doc.get(term, 0)
+            if not freq:
+                continue
+            df = sum(1 for d in docs if term in d)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            score += idf * freq * (k1 + 1) / (freq + k1 * (1 - b + b * length / (avg_len or 1)))
+        scores.append(score)
+    return scores
+
+
+@dataclass
+class CompressionResult:
+    """Compressed prompt inputs plus a report of what was cut."""
+    resume: str
+    job_description: str
+    keywords: List[str]
+    kept_chunks: int
+    total_chunks: int
+    resume_tokens_before: int
+    resume_tokens_after: int
+    job_tokens_before: int
+    job_tokens_after: int
+    dropped_chunks: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        return (
+            f"Resume: kept {self.kept_chunks}/{self.total_chunks} chunks "
+            f"(~{self.resume_tokens_after}/{self.resume_tokens_before} tokens). "
+            f"Job description: ~{self.job_tokens_after}/{self.job_tokens_before} tokens after removing boilerplate."
+        )
+
+
+def compress_inputs(resume: str, job_desc: str, resume_token_budget: int = 1500,
+                    keep_leading_chunks: int = 1) -> CompressionResult:
+    """Strip JD boilerplate and keep the resume chunks most relevant to it within a token budget.
+
+    A resume that already fits ``resume_token_budget`` is passed through unchanged.
+    Otherwise the first ``keep_leading_chunks`` resume chunks (name and contact
+    details) are always kept, the remaining chunks are added in BM25 order
+    (chunks with no keyword match last) while they fit the budget, and the kept
+    chunks are emitted in their original order.
+    """
+    clean_job_desc = strip_boilerplate(job_desc) or job_desc
+    keywords = extract_keywords(clean_job_desc)
+    chunks = split_resume(resume)
+    if estimate_tokens(resume) <= resume_token_budget:
+        return CompressionResult(
+            resume=resume,
+            job_description=clean_job_desc,
+            keywords=keywords,
+            kept_chunks=len(chunks),
+            total_chunks=len(chunks),
+            resume_tokens_before=estimate_tokens(resume),
+            resume_tokens_after=estimate_tokens(resume),
+            job_tokens_before=estimate_tokens(job_desc),
+            job_tokens_after=estimate_tokens(clean_job_desc),
+        )
+    scores = bm25_scores(chunks, keywords)
+
+    selected = set(range(min(keep_leading_chunks, len(chunks))))
+    used = sum(estimate_tokens(chunks[i]) for i in selected)
+    # sorted() is stable, so equally scored (e.g. unmatched) chunks are considered in resume order.
+    for i in sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True):
+        if i in selected:
+            continue
+        cost = estimate_tokens(chunks[i])
+        if used + cost <= resume_token_budget:
+            selected.add(i)
+            used += cost
+
+    compressed_resume = "\n\n".join(chunks[i] for i in sorted(selected))
+    return CompressionResult(
+        resume=compressed_resume,
+        job_description=clean_job_desc,
+        keywords=keywords,
+        kept_chunks=len(selected),
+        total_chunks=len(chunks),
+        resume_tokens_before=estimate_tokens(resume),
+        resume_tokens_after=estimate_tokens(compressed_resume),
+        job_tokens_before=estimate_tokens(job_desc),
+        job_tokens_after=estimate_tokens(clean_job_desc),
+        dropped_chunks=[chunks[i] for i in range(len(chunks)) if i not in selected],
+    )
@@ -0,0 +1,262 @@
+"""Prompt templates for CV tailoring and cover letter generation."""
+import re
+from typing import List, Tuple
+
+import yaml
+
+from prompt_compression import HEADING, extract_keywords, strip_boilerplate
+
+# Contact links add tokens without helping the model write the letter.
+COVER_LETTER_DROPPED_KEYS = {"website", "social_networks", "url", "doi", "photo"}
+
+
+def build_cv_prompt(resume: str, job_desc: str) -> str:
+    """Construct the system/user prompt with strict instructions.
+
+    The prompt enforces:
+    - Schema compliance
+    - No hallucination
+    - Irrelevant content filtering
+    - Highlight merging/splitting guidelines
+    """
+
+    return f"""
+**Role**: You are a world-class professional resume writer and career-coach AI. Your mission is to transform a generic resume into a highly-tailored, compelling CV optimized for a specific job description.
+
+**Objective**: Produce **one** JSON object that conforms **exactly** to the provided Pydantic and rendercv (v2) schema.
+
+---
+**Non-Negotiable Constraints**
+1. **Schema Fidelity** - Output **must** be valid JSON matching the `CV` model (no extra keys).
+2. **No Hallucination** - Omit any detail not present in the resume. If a field is missing, leave it out.
+3. **Relevancy Filter** - Include *only* experience, skills, education, and personal projects that directly or indirectly support the job description. Drop the rest.
+4. **Highlights Hygiene** -
+   - Split overly long or compound highlights into concise bullets (≤2 lines each).
+   - Each Experience can have up to 4 highlights for recent roles and 3 for older roles.
+   - Each Personal Project can have up to 3 highlights, focused on technologies, impact, and relevance to the job.
+5. **Action Verbs & Metrics** - Start bullets with strong verbs (e.g., "Led", "Architected") and quantify impact when possible (e.g., "Increased efficiency by 30%," "Managed a team of 5"). 
+6. **Markdown Emphasis** - Bold (`**`) any keyword that *exactly* matches a skill or responsibility from the job description (in `highlights`, `summary`, and `personal projects`).
+7. **Date Format** - Use YYYY-MM, YYYY, or "present" exactly as defined in the schema.
+8. **Username Extraction** - Return only usernames for social links (e.g., GitHub, LinkedIn).
+9. **Single-Page Target** - Keep the final CV to about **one page** (≈500-600 words when rendered). Trim or omit less critical details to fit including old experiences, non-relevant skills, and other extraneous information.
+
+---
+**Step-by-Step Process (internal - do not output)**
+1. **Analyse Inputs** - Identify the 5-7 most critical keywords/skills from the Job Description that are strongly relevant to the user's background. Map resume content to those.
+2. **Synthesise Content** -
+   - **Summary** - 2-3 sentences (≤3 lines totally) that pitch the candidate using those keywords.
+   - **Experience** - Rewrite recent roles; keep or remove older ones based on relevance. Ensure highlights follow Constraint 4 and overall length supports the single-page goal.
+   - **Skills** - Present only relevant skills, grouped under clear labels. Add missing JD keywords (**bolded**) if absent in resume but seems suitable.
+   - **Education** - Generally does not need any highlights. Only include entries when they directly strengthen candidacy for the role.
+   - **Personal Projects** - Include personal projects that demonstrate relevant skills, technologies, or impact. Focus on those most relevant to the job description. Personal projects is an optional section, so if no relevant projects exist, this section can be omitted.
+3. **Assemble JSON** - Populate the `CV` object and return *only* the JSON.
+
+---
+**Resume Content**:
+{resume}
+---
+**Job Description**:
+{job_desc}
+---
+"""
+
+def cv_messages(prompt: str) -> list:
+    return [
+        {"role": "system", "content": "You are a career-coach AI that returns JSON structured according to the provided Pydantic schema."},
+        {"role": "user", "content": prompt}
+    ]
+
+def build_cover_letter_prompt(yaml_resume: str, job_description: str) -> str:
+    """Construct the cover letter prompt from the YAML resume and job description."""
+    return f"""
+You are a world-class professional resume writer and career-coach AI. Your mission is to write a compelling, tailored cover letter for a job application.
+
+**Instructions:**
+1. Use the provided resume data (YAML format) and job description to craft a cover letter.
+2. The cover letter should be highly relevant, concise (max 350 words), and highlight the candidate's fit for the role.
+3. Use a professional, engaging tone. Do not hallucinate details not present in the resume.
+4. Address the letter to the appropriate role/company if possible (extract from job description).
+5. Output only the cover letter text, no formatting or extra commentary.
+
+---
+**Resume YAML:**
+{yaml_resume}
+---
+**Job Description:**
+{job_description}
+---
+"""
+
+def compact_cv_text(cv_data: dict, dropped_keys=COVER_LETTER_DROPPED_KEYS) -> str:
+    """Compact YAML projection of a CV dict for a prompt (by default, the cover letter prompt).
+
+    Drops empty values, ``dropped_keys`` and bold markers; the RenderCV
+    design/locale block is never included.
+    """
+    def prune(value):
+        if isinstance(value, dict):
+            pruned = {k: prune(v) for k, v in value.items() if k not in dropped_keys}
+            return {k: v for k, v in pruned.items() if v not in (None, "", [], {})}
+        if isinstance(value, list):
+            return [v for v in (prune(v) for v in value) if v not in (None, "", [], {})]
+        if isinstance(value, str):
+            return value.replace("**", "")
+        return value
+    return yaml.safe_dump(prune(cv_data), sort_keys=False, allow_unicode=True, width=1000)
+
+def cover_letter_resume(yaml_resume: str) -> str:
+    """Compact projection of an (edited) RenderCV YAML document; unparseable YAML is used as is."""
+    try:
+        document = yaml.safe_load(yaml_resume)
+    except yaml.YAMLError:
+        return yaml_resume
+    if not isinstance(document, dict) or not isinstance(document.get("cv"), dict):
+        return yaml_resume
+    return compact_cv_text(document["cv"])
+
+def build_refine_prompt(cv_data: dict, job_desc: str, target: str, instructions: str = "") -> str:
+    """Construct the prompt that rewrites one part of an already tailored CV."""
+    extra = f"5. **User Instructions** - {instructions.strip()}\n" if instructions.strip() else ""
+    return f"""
+**Role**: You are a world-class professional resume writer and career-coach AI refining an already tailored CV.
+
+**Objective**: Rewrite **only** {target} so it is as compelling as possible for the job description, and return it as one JSON object matching the provided schema.
+
+---
+**Non-Negotiable Constraints**
+1. **No Hallucination** - Use only facts present in the current CV. Do not invent employers, dates, numbers or skills.
+2. **Action Verbs & Metrics** - Start bullets with strong verbs and keep every quantified result.
+3. **Markdown Emphasis** - Bold (`**`) any keyword that *exactly* matches a skill or responsibility from the job description.
+4. **Length** - Keep roughly the current length so the CV stays on one page.
+{extra}
+---
+**Current CV (YAML)**:
+{yaml.safe_dump(cv_data, sort_keys=False, allow_unicode=True, width=1000)}
+---
+**Job Description**:
+{job_desc}
+---
+"""
+
+def build_profile_prompt(resume: str) -> str:
+    """Construct the prompt that parses a resume into a complete, untailored master profile."""
+    return f"""
+**Role**: You are a meticulous resume parser.
+
+**Objective**: Convert the resume below into **one** JSON object that conforms **exactly** to the provided schema. This is the candidate's complete master profile; it is **not** tailored to any job.
+
+---
+**Non-Negotiable Constraints**
+1. **Completeness** - Keep every experience, education entry, project, publication, skill and highlight. Do not drop, merge or shorten anything.
+2. **Fidelity** - Keep the original wording of every highlight. Do not rewrite, embellish or bold anything.
+3. **No Hallucination** - Omit any detail not present in the resume. If a field is missing, leave it out.
+4. **Summary** - Use the resume's own summary or objective; if there is none, write one neutral sentence from facts in the resume.
+5. **Date Format** - Use YYYY-MM, YYYY, or "present" exactly as defined in the schema.
+6. **Username Extraction** - Return only usernames for social links (e.g., GitHub, LinkedIn).
+
+---
+**Resume Content**:
+{resume}
+---
+"""
+
+# What each part of the CV needs from the resume (matched against its headings) and how to write it.
+SECTION_HEADINGS = {
+    "Summary": r"summary|profile|objective|about",
+    "Skills": r"skills?|technolog|competenc|tools|stack",
+    "Education": r"education|academic|degrees?|certific|qualification",
+    "Experience": r"experience|employment|work|career|positions",
+    "Publications": r"publications?|papers|research",
+    "PersonalProjects": r"projects?",
+}
+SECTION_GUIDELINES = {
+    "header": "Copy name, location, email, phone and website from the resume. Return only usernames for social "
+              "networks (e.g., GitHub, LinkedIn). Use E.164 format for the phone number.",
+    "Summary": "2-3 sentences (≤3 lines totally) that pitch the candidate using the 5-7 job keywords most strongly "
+               "supported by the resume.",
+    "Skills": "Present only relevant skills, grouped under clear labels. Add missing job description keywords "
+              "(**bolded**) if absent in the resume but suitable.",
+    "Education": "Generally no highlights. Only include entries that directly strengthen candidacy for the role.",
+    "Experience": "Rewrite recent roles; keep or remove older ones based on relevance. Up to 4 highlights for recent "
+                  "roles and 3 for older roles, each ≤2 lines; split compound highlights. Start bullets with strong "
+                  "verbs and quantify impact when possible.",
+    "Publications": "Include only publications relevant to the role, with titles, authors, journal and dates exactly "
+                    "as in the resume.",
+    "PersonalProjects": "Include projects that demonstrate relevant skills, technologies or impact, with up to 3 "
+                        "highlights each. Leave the list empty if none are relevant.",
+}
+_KNOWN_HEADING = re.compile(r"^\W*(" + "|".join(SECTION_HEADINGS.values()) + r")\b", re.IGNORECASE)
+
+
+def _resume_sections(resume: str) -> List[Tuple[str, str]]:
+    """(heading, text) pairs of the resume's known sections; the text before the first one has heading ""."""
+    sections, heading, lines = [], "", []
+    for line in resume.splitlines():
+        # "Skills: Go, Python" starts a section as much as a heading line does.
+        title = line.strip().strip("#*- ").split(":")[0].strip("* ")
+        if (HEADING.match(line) or len(title.split()) <= 4) and _KNOWN_HEADING.match(title):
+            sections.append((heading, "\n".join(lines).strip()))
+            heading, lines = title, []
+        lines.append(line)
+    sections.append((heading, "\n".join(lines).strip()))
+    return [(h, text) for h, text in sections if text]
+
+
+def resume_excerpt(resume: str, part: str) -> str:
+    """The parts of ``resume`` under headings relevant to one CV part (the leading text for the header).
+
+    Falls back to the whole resume when no matching section is found, so
+    unusual layouts lose nothing. The summary always sees the whole resume.
+    """
+    sections = _resume_sections(resume)
+    if part == "header":
+        excerpt = "\n\n".join(text for heading, text in sections if not heading)
+    elif part in SECTION_HEADINGS and part != "Summary":
+        pattern = re.compile(r"^\W*(" + SECTION_HEADINGS[part] + r")\b", re.IGNORECASE)
+        excerpt = "\n\n".join(text for heading, text in sections if heading and pattern.match(heading))
+    else:
+        excerpt = ""
+    return excerpt or resume
+
+
+# Parts written from the job description itself; the others only need its keywords, the header neither.
+FULL_JOB_DESCRIPTION_PARTS = {"Summary", "Experience"}
+
+
+def build_section_prompt(resume: str, job_desc: str, part: str, description: str) -> str:
+    """Construct the prompt for a single part of the CV.
+
+    Only the resume sections and guidelines relevant to ``part`` are included.
+    The summary and experience prompts get the job description without
+    boilerplate, other sections its ranked keywords and the header nothing.
+    """
+    if part == "header":
+        job = ""
+    elif part in FULL_JOB_DESCRIPTION_PARTS:
+        job = f"""**Job Description**:
+{strip_boilerplate(job_desc) or job_desc}
+---
+"""
+    else:
+        job = f"""**Job Description Keywords** (most important first):
+{", ".join(extract_keywords(strip_boilerplate(job_desc) or job_desc))}
+---
+"""
+    return f"""
+**Role**: You are a world-class professional resume writer and career-coach AI tailoring one part of a CV to a specific job description.
+
+**Objective**: Produce **only** the {description} part of the CV as one JSON object matching the provided schema.
+
+---
+**Non-Negotiable Constraints**
+1. **No Hallucination** - Omit any detail not present in the resume. If a field is missing, leave it out.
+2. **Relevancy Filter** - Include *only* content that directly or indirectly supports the job description; the whole CV should fit on about one page.
+3. **Markdown Emphasis** - Bold (`**`) any keyword that *exactly* matches a skill or responsibility from the job description.
+4. **Date Format** - Use YYYY-MM, YYYY, or "present" exactly as defined in the schema.
+5. **Guidelines** - {SECTION_GUIDELINES.get(part, "Follow the schema descriptions.")}
+
+---
+**Resume Content**:
+{resume_excerpt(resume, part)}
+---
+{job}"""
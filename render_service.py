@@ -0,0 +1,334 @@
+"""Isolated, concurrent-safe PDF rendering with a pool of warm RenderCV workers.
+
+Every render runs in its own temporary directory inside a worker process that
+has already imported RenderCV/Typst, so concurrent sessions never share output
+paths and do not pay engine start-up on each request.
+"""
+import hashlib
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from importlib import metadata
+from typing import Dict, Optional, Tuple
+
+import yaml
+
+import tracing
+
+WARM_UP_YAML = """cv:
+  name: Warm Up
+  sections:
+    Summary:
+    - Warm-up render.
+design:
+  theme: engineeringresumes
+"""
+
+
+class RenderError(Exception):
+    """Raised when a render fails, times out, or is rejected because the queue is full."""
+
+
+def _render_in_directory(yaml_string: str, directory: str) -> Tuple[bytes, Dict[str, float]]:
+    started = time.perf_counter()
+    from rendercv.cli.commands import cli_command_render
+    timings = {"rendercv_import": time.perf_counter() - started}
+
+    yaml_path = os.path.join(directory, "cv.yaml")
+    pdf_path = os.path.join(directory, "cv.pdf")
+    with open(yaml_path, "w") as f:
+        f.write(yaml_string)
+    started = time.perf_counter()
+    cli_command_render(
+        input_file_name=yaml_path,
+        output_folder_name=os.path.join(directory, "rendercv_output"),
+        pdf_path=pdf_path,
+        dont_generate_markdown=True,
+        dont_generate_html=True,
+        dont_generate_png=True
+    )
+    timings["cli_command_render"] = time.perf_counter() - started
+    if not os.path.exists(pdf_path) or os.path.getsize(pdf_path) == 0:
+        raise RenderError("RenderCV did not produce a PDF. Check the YAML for schema errors.")
+    started = time.perf_counter()
+    with open(pdf_path, "rb") as pdf_file:
+        pdf_bytes = pdf_file.read()
+    timings["pdf_readback"] = time.perf_counter() - started
+    return pdf_bytes, timings
+
+
+def _timed_render_yaml(yaml_string: str) -> Tuple[bytes, Dict[str, float]]:
+    with tempfile.TemporaryDirectory(prefix="career_flow_render_") as directory:
+        try:
+            return _render_in_directory(yaml_string, directory)
+        except RenderError:
+            raise
+        except Exception as e:
+            # RenderCV/typer exceptions are not always picklable across processes.
+            raise RenderError(f"{type(e).__name__}: {e}") from None
+
+
+def render_yaml(yaml_string: str) -> bytes:
+    """Render a RenderCV YAML document to PDF bytes in a private temporary directory."""
+    return _timed_render_yaml(yaml_string)[0]
+
+
+def _warm_up_worker():
+    """Load RenderCV and Typst (fonts, templates) once per worker process."""
+    try:
+        render_yaml(WARM_UP_YAML)
+    except Exception:
+        pass
+
+
+def _worker_main(conn) -> None:
+    """Worker process: warm up, then render each YAML string received on ``conn`` until it is closed."""
+    _warm_up_worker()
+    conn.send(None)
+    while True:
+        try:
+            yaml_string = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, _timed_render_yaml(yaml_string)))
+        except RenderError as e:
+            conn.send((False, e))
+
+
+class _Worker:
+    """One warm render process and the pipe it takes work from."""
+
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        # Daemonic, so a server that exits without shutdown() does not wait on idle workers.
+        self.process = context.Process(target=_worker_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def wait_ready(self) -> None:
+        try:
+            self.conn.recv()
+        except (EOFError, OSError):
+            pass  # Died while warming up; the first render sent to it reports the crash.
+
+    def stop(self) -> None:
+        self.process.terminate()
+        self.process.join(5)
+        self.conn.close()
+
+
+def _rendercv_version() -> str:
+    try:
+        return metadata.version("rendercv")
+    except metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def _canonical(document):
+    """``document`` with the mappings whose order RenderCV renders (``cv``, ``cv.sections``) as ordered pairs.
+
+    Every other mapping (entries, ``design``, ``locale``) is left to be dumped with sorted keys.
+    """
+    if not isinstance(document, dict) or not isinstance(document.get("cv"), dict):
+        return document
+    cv = dict(document["cv"])
+    if isinstance(cv.get("sections"), dict):
+        cv["sections"] = {"ordered": [[name, entries] for name, entries in cv["sections"].items()]}
+    return {**document, "cv": {"ordered": [[key, value] for key, value in cv.items()]}}
+
+
+def render_cache_key(yaml_string: str) -> str:
+    """Hash the YAML by content, so whitespace, comments and key order within entries do not change the key.
+
+    Section order is rendered as written, so moving a section changes the key.
+    """
+    try:
+        canonical = yaml.safe_dump(_canonical(yaml.safe_load(yaml_string)), sort_keys=True, default_flow_style=False)
+    except yaml.YAMLError:
+        # Unparseable YAML will fail to render anyway; fall back to the raw text.
+        canonical = yaml_string
+    return hashlib.sha256(f"{_rendercv_version()}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Two-level LRU cache of rendered PDFs: a small in-memory tier over an on-disk tier.
+
+    Args:
+        directory: Where PDFs are stored as ``<key>.pdf``.
+        max_memory_entries: PDFs kept in memory.
+        max_disk_entries: PDFs kept on disk; least recently used are evicted first.
+    """
+
+    def __init__(self, directory: str, max_memory_entries: int = 32, max_disk_entries: int = 500):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pdf")
+
+    def _remember(self, key: str, pdf_bytes: bytes) -> None:
+        self._memory[key] = pdf_bytes
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                pdf_bytes = f.read()
+            os.utime(path, None)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self._remember(key, pdf_bytes)
+            self.hits += 1
+        return pdf_bytes
+
+    def set(self, key: str, pdf_bytes: bytes) -> None:
+        with self._lock:
+            self._remember(key, pdf_bytes)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(pdf_bytes)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pdf"):
+                path = os.path.join(self.directory, name)
+                try:
+                    entries.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_disk_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+class RenderService:
+    """Pool of warm worker processes that renders RenderCV YAML to PDF bytes.
+
+    Each render runs on a worker of its own; a worker that hangs or crashes is
+    replaced on its own, so renders running on the other workers are unaffected.
+
+    Args:
+        max_workers: Number of warm worker processes.
+        timeout: Seconds a render may run on its worker (time spent queued for a worker is not counted).
+        max_queue_depth: Maximum renders in flight (running or queued); further requests are rejected.
+        cache: Optional RenderCache consulted before rendering.
+    """
+
+    def __init__(self, max_workers: int = 2, timeout: float = 60.0, max_queue_depth: int = 8,
+                 cache: Optional[RenderCache] = None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self._slots = threading.BoundedSemaphore(max_queue_depth)
+        self._lock = threading.Lock()
+        # Spawn rather than fork: the Streamlit server process is multi-threaded.
+        self._context = multiprocessing.get_context("spawn")
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._closed = False
+        for _ in range(max_workers):
+            self._start_worker()
+
+    def _start_worker(self) -> None:
+        """Start a worker and make it available once warmed up, without blocking the caller."""
+        worker = _Worker(self._context)
+        with self._lock:
+            self._workers.add(worker)
+
+        def warm_up():
+            worker.wait_ready()
+            self._idle.put(worker)
+
+        threading.Thread(target=warm_up, name="career-flow-render-warm-up", daemon=True).start()
+
+    def _replace_worker(self, worker: _Worker) -> None:
+        with self._lock:
+            self._workers.discard(worker)
+            closed = self._closed
+        threading.Thread(target=worker.stop, name="career-flow-render-stop", daemon=True).start()
+        if not closed:
+            self._start_worker()
+
+    def render(self, yaml_string: str) -> bytes:
+        """Render ``yaml_string`` and return the PDF bytes, reusing a cached PDF for equivalent YAML."""
+        if self.cache is None:
+            return self._render(yaml_string)
+        with tracing.span("render_cache_lookup") as lookup:
+            key = render_cache_key(yaml_string)
+            pdf_bytes = self.cache.get(key)
+            lookup["attributes"]["hit"] = pdf_bytes is not None
+        if pdf_bytes is None:
+            pdf_bytes = self._render(yaml_string)
+            self.cache.set(key, pdf_bytes)
+        return pdf_bytes
+
+    def _render(self, yaml_string: str) -> bytes:
+        if not self._slots.acquire(blocking=False):
+            raise RenderError("The PDF renderer is busy. Please try again in a moment.")
+        try:
+            # Waiting for a free worker is bounded by the queue depth, not by the timeout.
+            worker = self._idle.get()
+            try:
+                worker.conn.send(yaml_string)
+                if not worker.conn.poll(self.timeout):
+                    # A running render cannot be interrupted; kill its worker so it is not held forever.
+                    self._replace_worker(worker)
+                    raise RenderError(f"PDF rendering timed out after {self.timeout:g} seconds.")
+                ok, result = worker.conn.recv()
+            except (EOFError, OSError):
+                self._replace_worker(worker)
+                raise RenderError("A PDF render worker crashed and has been restarted. Please try again.")
+            self._idle.put(worker)
+            if not ok:
+                raise result
+            pdf_bytes, timings = result
+            for stage, seconds in timings.items():
+                tracing.record(stage, seconds)
+            return pdf_bytes
+        finally:
+            self._slots.release()
+
+    def shutdown(self):
+        with self._lock:
+            self._closed = True
+            workers, self._workers = list(self._workers), set()
+        for worker in workers:
+            worker.stop()
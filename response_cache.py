@@ -0,0 +1,116 @@
+"""Persistent, content-addressed cache for LLM responses.
+
+Entries are stored as JSON files named by the SHA-256 of their key parts, so
+identical (model, prompt, schema version) requests are served from disk
+instead of hitting the OpenAI API again.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Optional
+
+
+def make_key(*parts: str) -> str:
+    """Return a stable SHA-256 hex digest for the given key parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        encoded = part.encode("utf-8")
+        # Length-prefix each part so ("ab", "c") and ("a", "bc") differ.
+        digest.update(len(encoded).to_bytes(8, "big"))
+        digest.update(encoded)
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """On-disk JSON cache with size- and age-based eviction.
+
+    Args:
+        directory: Where cache entries are written.
+        max_entries: Maximum number of entries kept; least recently used are evicted first.
+        max_age_seconds: Entries written longer ago than this are treated as misses and removed,
+            however often they are read.
+
+    An entry's mtime is the time it was written and its atime the time it was last read.
+    """
+
+    def __init__(self, directory: str, max_entries: int = 500, max_age_seconds: float = 7 * 24 * 3600):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None on a miss."""
+        path = self._path(key)
+        try:
+            written = os.path.getmtime(path)
+            if time.time() - written > self.max_age_seconds:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, "r", encoding="utf-8") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        # Record the read in atime only, so eviction is least-recently-used while mtime keeps the write time.
+        try:
+            os.utime(path, (time.time(), written))
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable ``value`` under ``key`` and evict if needed."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                self._remove(path)
+            else:
+                entries.append((max(stat.st_atime, stat.st_mtime), path))
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current hit rate."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
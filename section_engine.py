@@ -0,0 +1,169 @@
+"""Parallel per-section CV generation.
+
+Instead of one large structured-output call, the CV header and every
+``Sections`` field are generated concurrently with their own small response
+models and prompts (only the resume sections and guidelines relevant to
+the part, see prompts.build_section_prompt), then assembled and validated
+as a full ``CV``. A failing part is
+retried on its own without regenerating the others. The same sub-models
+are used to regenerate a single part of an already tailored CV.
+"""
+import contextvars
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, ValidationError, create_model
+
+from cv_repair import validate_with_repair, with_repair
+from models import CV, ExperienceEntry, Sections
+from prompts import build_refine_prompt, build_section_prompt, cv_messages
+import tracing
+
+HEADER_PART = "header"
+
+# Sub-models are derived from CV/Sections so they never drift from the main schema,
+# and repair common formatting slips locally before instructor re-asks.
+CVHeader = with_repair(create_model(
+    "CVHeader",
+    **{name: (field.annotation, field) for name, field in CV.model_fields.items() if name != "sections"},
+))
+SECTION_MODELS: Dict[str, type] = {
+    name: with_repair(create_model(f"{name}Section", **{name: (field.annotation, field)}))
+    for name, field in Sections.model_fields.items()
+}
+ExperienceHighlights = with_repair(create_model(
+    "ExperienceHighlights", highlights=(ExperienceEntry.model_fields["highlights"].annotation,
+                                        ExperienceEntry.model_fields["highlights"]),
+))
+PART_DESCRIPTIONS = {HEADER_PART: "header (name, location, contact details and social networks)"}
+# instructor makes one attempt per call, so the retry loops below are the only layer above the SDK's
+# own retries: at most max_attempts x (SDK max_retries + 1) requests per part.
+INSTRUCTOR_MAX_RETRIES = 1
+
+
+class SectionGenerationError(Exception):
+    """Raised when a required part of the CV still fails after its retries."""
+
+    def __init__(self, failures: Dict[str, Exception]):
+        self.failures = failures
+        details = "; ".join(f"{part}: {error}" for part, error in failures.items())
+        super().__init__(f"Failed to generate CV part(s): {details}")
+
+
+def _retry_delay(error: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after ``error``, or None if it is not worth another attempt.
+
+    Validation failures are retried at once; rate-limit, server and connection errors after the
+    server's Retry-After or a jittered exponential backoff. Auth or bad requests are not retried.
+    """
+    from openai import APIConnectionError, InternalServerError, RateLimitError
+    try:
+        from instructor.core import InstructorRetryException
+    except ImportError:  # instructor < 1.11
+        from instructor.exceptions import InstructorRetryException
+
+    if isinstance(error, InstructorRetryException):
+        if getattr(error, "n_attempts", 1) > 1 or not error.args or not isinstance(error.args[0], BaseException):
+            return None  # instructor already used up its own attempts on this request.
+        # instructor wraps the error of its single attempt, whatever its type.
+        error = error.args[0]
+    if isinstance(error, ValidationError):
+        return 0.0
+    if not isinstance(error, (APIConnectionError, InternalServerError, RateLimitError)):
+        return None
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(header)
+    except (TypeError, ValueError):
+        return min(30.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+def _create_with_retries(client, model: str, prompt: str, response_model: type, max_attempts: int) -> BaseModel:
+    for attempt in range(max_attempts):
+        try:
+            return client.chat.completions.create(
+                model=model,
+                messages=cv_messages(prompt),
+                response_model=response_model,
+                max_retries=INSTRUCTOR_MAX_RETRIES,
+            )
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if attempt == max_attempts - 1 or delay is None:
+                raise
+            tracing.add("section_attempts_failed")
+            time.sleep(delay)
+
+
+def _generate_part(client, model: str, resume: str, job_desc: str, part: str,
+                   response_model: type, max_attempts: int) -> dict:
+    prompt = build_section_prompt(resume, job_desc, part, PART_DESCRIPTIONS.get(part, f"`{part}`"))
+    with tracing.span("llm_section", part=part, model=model):
+        return _create_with_retries(client, model, prompt, response_model, max_attempts).model_dump(mode="json")
+
+
+def generate_cv_by_section(client, model: str, resume: str, job_desc: str,
+                           max_workers: Optional[int] = None, max_attempts: int = 3) -> dict:
+    """Generate every CV part concurrently and return the validated CV as a dict.
+
+    Args:
+        client: instructor client (see clients.ClientRegistry.instructor).
+        model: OpenAI model name.
+        resume: Resume text.
+        job_desc: Job description text.
+        max_workers: Concurrent requests; defaults to one per part.
+        max_attempts: Attempts per part before it is reported as failed.
+
+    Optional sections that fail are omitted; failures of required parts raise
+    SectionGenerationError.
+    """
+    parts = {HEADER_PART: CVHeader, **SECTION_MODELS}
+    with ThreadPoolExecutor(max_workers=max_workers or len(parts)) as executor:
+        futures = {
+            # Each worker runs in a copy of the caller's context so its spans join the caller's trace.
+            part: executor.submit(contextvars.copy_context().run, _generate_part, client, model, resume, job_desc,
+                                  part, response_model, max_attempts)
+            for part, response_model in parts.items()
+        }
+
+    results, failures = {}, {}
+    for part, future in futures.items():
+        try:
+            results[part] = future.result()
+        except Exception as e:
+            if part == HEADER_PART or Sections.model_fields[part].is_required():
+                failures[part] = e
+    if failures:
+        raise SectionGenerationError(failures)
+
+    sections = {}
+    for part in SECTION_MODELS:
+        sections.update(results.get(part, {}))
+    return validate_with_repair(CV, {**results[HEADER_PART], "sections": sections}).model_dump(mode="json")
+
+
+def regenerate_part(client, model: str, cv_data: dict, job_desc: str, section: str,
+                    entry_index: Optional[int] = None, instructions: str = "", max_attempts: int = 3) -> Any:
+    """Regenerate one section of an existing CV, or one Experience entry's highlights.
+
+    The current CV (including the user's edits) and the job description are
+    the only inputs. Returns the new, validated value of the section (or the
+    highlights list); merging it back is left to the caller (see models.merge_cv_part).
+    """
+    if section not in SECTION_MODELS:
+        raise ValueError(f"Unknown CV section {section!r}")
+    if entry_index is None:
+        target, response_model, field = f"the `{section}` section", SECTION_MODELS[section], section
+    else:
+        if section != "Experience":
+            raise ValueError("Only Experience entries can be regenerated individually")
+        entry = cv_data["sections"]["Experience"][entry_index]
+        target = f"the `highlights` of the Experience entry \"{entry.get('position')}\" at \"{entry.get('company')}\""
+        response_model, field = ExperienceHighlights, "highlights"
+
+    prompt = build_refine_prompt(cv_data, job_desc, target, instructions)
+    with tracing.span("llm_refine", part=section if entry_index is None else f"{section}[{entry_index}]", model=model):
+        return _create_with_retries(client, model, prompt, response_model, max_attempts).model_dump(mode="json")[field]
@@ -0,0 +1,120 @@
+"""Cold-start profile of the Streamlit app: import time per package and time to first render.
+
+Runs the app once in a fresh interpreter with ``-X importtime`` (through
+Streamlit's AppTest, so no server or browser is needed) and reports the
+packages that took longest to import and the time from interpreter start to
+the end of the first script run.
+
+    python startup_profile.py                 # report the 15 slowest packages
+    python startup_profile.py --budget 4.0    # also exit 1 if the first render takes longer than 4 s
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+# Executed in the child interpreter; prints a JSON summary as its last line. It is run
+# from a file with a __main__ guard so spawned render workers can import it safely.
+CHILD = """
+import json, os, time
+
+if __name__ == "__main__":
+    started = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    app = AppTest.from_file({app!r}, default_timeout={timeout})
+    app.session_state["storage_init"] = {{}}  # LocalStorage would otherwise wait for a browser to answer
+    app.run()
+    print(json.dumps({{
+        "first_render_s": time.time() - float(os.environ["CAREER_FLOW_PROFILE_LAUNCHED"]),
+        "script_s": time.perf_counter() - started,
+        "exceptions": [e.message for e in app.exception],
+    }}))
+"""
+
+
+def parse_import_times(stderr: str) -> Dict[str, float]:
+    """Seconds spent importing each top-level package (sum of its modules' self time)."""
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            totals[match[3].split(".")[0]] += int(match[1]) / 1e6
+    return dict(totals)
+
+
+def profile_startup(app: str = APP, timeout: float = 60.0, warm_up: bool = False) -> Tuple[dict, Dict[str, float]]:
+    """Run ``app`` once in a fresh interpreter; return (child summary, import seconds per package).
+
+    Import times include any worker processes the app starts, since they inherit ``-X importtime``.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as f:
+        f.write(CHILD.format(app=app, timeout=timeout))
+    env = dict(os.environ, CAREER_FLOW_WARM_UP="1" if warm_up else "0", CAREER_FLOW_PROFILE_LAUNCHED=str(time.time()))
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", f.name],
+            cwd=os.path.dirname(app), env=env, capture_output=True, text=True, timeout=timeout + 30,
+        )
+    finally:
+        os.remove(f.name)
+    if completed.returncode != 0:
+        raise RuntimeError(f"App run failed:\n{completed.stdout}\n{_without_import_lines(completed.stderr)}")
+    # Worker processes share stdout, so pick out the summary line rather than taking the last one.
+    summary = json.loads([line for line in completed.stdout.splitlines() if line.startswith('{"first_render_s"')][-1])
+    return summary, parse_import_times(completed.stderr)
+
+
+def _without_import_lines(stderr: str) -> str:
+    return "\n".join(line for line in stderr.splitlines() if not line.startswith("import time:"))
+
+
+def format_report(summary: dict, imports: Dict[str, float], top: int) -> List[str]:
+    lines = [
+        f"Time to first render: {summary['first_render_s']:.2f} s (process launch to end of the first script run; "
+        f"{summary['script_s']:.2f} s of it in the script)",
+        f"Total import time: {sum(imports.values()):.2f} s",
+        "",
+        f"{'package':<32}{'import s':>10}",
+        "-" * 42,
+    ]
+    for package, seconds in sorted(imports.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"{package:<32}{seconds:>10.3f}")
+    for message in summary["exceptions"]:
+        lines.append(f"App raised: {message}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the app's cold start (import times and time to first render).")
+    parser.add_argument("--app", default=APP, help="Streamlit script to profile.")
+    parser.add_argument("--top", type=int, default=15, help="Number of packages to list.")
+    parser.add_argument("--budget", type=float, help="Fail (exit 1) if time to first render exceeds this many seconds.")
+    parser.add_argument("--runs", type=int, default=1, help="Cold starts to measure; the fastest is reported.")
+    parser.add_argument("--with-warm-up", action="store_true", help="Keep the background warm-up enabled while measuring.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds allowed for the first script run.")
+    args = parser.parse_args()
+
+    summary, imports = min(
+        (profile_startup(args.app, args.timeout, args.with_warm_up) for _ in range(args.runs)),
+        key=lambda result: result[0]["first_render_s"],
+    )
+    print("\n".join(format_report(summary, imports, args.top)))
+    if summary["exceptions"]:
+        raise SystemExit(1)
+    if args.budget is not None and summary["first_render_s"] > args.budget:
+        print(f"Time to first render {summary['first_render_s']:.2f} s exceeds the {args.budget:.2f} s budget.",
+              file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
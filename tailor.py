@@ -1,21 +1,20 @@
 import argparse
+import asyncio
+import json
 import os
-from openai import OpenAI
+import random
+import re
+import time
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError
 
-def main():
-    parser = argparse.ArgumentParser(description="Tailor a resume and draft a cover letter.")
-    parser.add_argument("resume", help="Path to the resume file.")
-    parser.add_argument("job_description", help="Path to the job description file.")
-    args = parser.parse_args()
+import tracing
 
-    with open(args.resume, 'r') as f:
-        resume_content = f.read()
-    with open(args.job_description, 'r') as f:
-        job_description_content = f.read()
+MODEL_NAME = "gpt-4o-mini"
+SYSTEM_PROMPT = "You are a career-coach AI. Rewrite the résumé bullets to emphasize skills the job ad requires; then draft a 250-word cover letter."
 
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
-    prompt = f"""You are a career-coach AI. Rewrite the résumé bullets to emphasize skills the job ad requires; then draft a 250-word cover letter.
+def _build_prompt(resume_content: str, job_description_content: str) -> str:
+    return f"""{SYSTEM_PROMPT}
 
 Resume:
 {resume_content}
@@ -24,18 +23,199 @@ Job Description:
 {job_description_content}
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": "You are a career-coach AI. Rewrite the résumé bullets to emphasize skills the job ad requires; then draft a 250-word cover letter."},
-            {"role": "user", "content": prompt}
-        ]
-    )
+
+def _messages(resume_content: str, job_description_content: str) -> list:
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": _build_prompt(resume_content, job_description_content)}
+    ]
+
+
+def load_job_descriptions(path: str) -> list:
+    """Load (job_id, job_description) pairs from a directory of text files or a JSONL file.
+
+    JSONL lines must contain a ``job_description`` (or ``text``) field and may
+    contain an ``id``; otherwise the line number is used.
+    """
+    jobs = []
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            file_path = os.path.join(path, name)
+            if os.path.isfile(file_path) and name.endswith((".txt", ".md")):
+                with open(file_path, 'r') as f:
+                    jobs.append((os.path.splitext(name)[0], f.read()))
+    else:
+        with open(path, 'r') as f:
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                text = record.get("job_description") or record.get("text")
+                if not text:
+                    raise ValueError(f"{path}:{line_number}: missing 'job_description' field")
+                jobs.append((str(record.get("id", line_number)), text))
+    return jobs
+
+
+def _safe_filename(job_id: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", job_id).strip("._") or "job"
+
+
+def output_names(job_ids: list) -> list:
+    """One output file name per job, numbered where IDs would otherwise map to the same file."""
+    names, used = [], set()
+    for job_id in job_ids:
+        base = _safe_filename(job_id)
+        name, n = f"{base}.md", 1
+        while name in used:
+            n += 1
+            name = f"{base}-{n}.md"
+        used.add(name)
+        names.append(name)
+    return names
+
+
+class RateLimiter:
+    """Spaces request starts so at most ``requests_per_minute`` are issued per minute."""
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Errors worth retrying; the SDK's own retries are disabled so these all go through the rate limiter.
+TRANSIENT_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+def _retry_after(error: Exception, attempt: int) -> float:
+    """Seconds to wait before a retry: the server's Retry-After if given, else jittered exponential backoff."""
+    response = getattr(error, "response", None)
+    header = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(header)
+    except (TypeError, ValueError):
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+
+async def _tailor_one(client, resume_content, job_id, job_description_content, output_path,
+                      semaphore, rate_limiter, max_retries):
+    with tracing.span("prompt_build", job_id=job_id):
+        messages = _messages(resume_content, job_description_content)
+    async with semaphore:
+        with tracing.span("llm_call", job_id=job_id, model=MODEL_NAME):
+            for attempt in range(max_retries + 1):
+                await rate_limiter.wait()
+                try:
+                    response = await client.chat.completions.create(model=MODEL_NAME, messages=messages)
+                    break
+                except TRANSIENT_ERRORS as e:
+                    if attempt == max_retries:
+                        raise
+                    tracing.add("retries")
+                    await asyncio.sleep(_retry_after(e, attempt))
+            tracing.add_usage(response.usage)
+
+    with tracing.span("write_output", job_id=job_id):
+        with open(output_path, "w") as f:
+            f.write(response.choices[0].message.content)
+    return output_path
+
+
+async def run_batch(resume_content, jobs, output_dir, concurrency=8, requests_per_minute=0.0, max_retries=5):
+    """Tailor the resume against every job concurrently, writing each result as soon as it finishes.
+
+    Returns a list of (job_id, error) tuples for jobs that failed.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    # The SDK's own retries would bypass the rate limiter and multiply --max-retries, so this loop owns backoff.
+    client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"), max_retries=0)
+    semaphore = asyncio.Semaphore(concurrency)
+    rate_limiter = RateLimiter(requests_per_minute)
+
+    async def run(job_id, text, output_path):
+        try:
+            return job_id, await _tailor_one(client, resume_content, job_id, text, output_path,
+                                             semaphore, rate_limiter, max_retries), None
+        except Exception as e:
+            return job_id, None, e
+
+    failures = []
+    names = output_names([job_id for job_id, _ in jobs])
+    tasks = [asyncio.create_task(run(job_id, text, os.path.join(output_dir, name)))
+             for (job_id, text), name in zip(jobs, names)]
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        job_id, output_path, error = await task
+        if error:
+            failures.append((job_id, error))
+            print(f"[{done}/{len(tasks)}] {job_id}: failed ({error})")
+        else:
+            print(f"[{done}/{len(tasks)}] {job_id}: wrote {output_path}")
+    await client.close()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tailor a resume and draft a cover letter.")
+    parser.add_argument("resume", help="Path to the resume file.")
+    parser.add_argument("job_description", help="Path to the job description file, or a directory / JSONL file of job descriptions for batch mode.")
+    parser.add_argument("--output-dir", default="outputs", help="Batch mode: directory for per-job output files.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Batch mode: maximum simultaneous requests.")
+    parser.add_argument("--requests-per-minute", type=float, default=0.0, help="Batch mode: cap on request rate (0 = unlimited).")
+    parser.add_argument("--max-retries", type=int, default=5, help="Batch mode: retries per job on rate-limit (429), server and connection errors.")
+    parser.add_argument("--trace-jsonl", help="Append per-stage timing spans to this JSON-lines file.")
+    parser.add_argument("--metrics-prom", help="Write per-stage metrics to this file in Prometheus text format.")
+    args = parser.parse_args()
+
+    trace = tracing.start_trace()
+    try:
+        _run(args)
+    finally:
+        tracing.export(trace, args.trace_jsonl, args.metrics_prom)
+
+
+def _run(args):
+    with tracing.span("read_inputs"):
+        with open(args.resume, 'r') as f:
+            resume_content = f.read()
+
+    if os.path.isdir(args.job_description) or args.job_description.endswith(".jsonl"):
+        with tracing.span("read_inputs"):
+            jobs = load_job_descriptions(args.job_description)
+        failures = asyncio.run(run_batch(resume_content, jobs, args.output_dir, args.concurrency,
+                                         args.requests_per_minute, args.max_retries))
+        print(f"Tailored {len(jobs) - len(failures)} of {len(jobs)} job descriptions into {args.output_dir}/")
+        if failures:
+            raise SystemExit(1)
+        return
+
+    with tracing.span("read_inputs"):
+        with open(args.job_description, 'r') as f:
+            job_description_content = f.read()
+
+    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+
+    with tracing.span("prompt_build"):
+        messages = _messages(resume_content, job_description_content)
+    with tracing.span("llm_call", model=MODEL_NAME):
+        response = client.chat.completions.create(model=MODEL_NAME, messages=messages)
+        tracing.add_usage(response.usage)
 
     output_content = response.choices[0].message.content
 
-    with open("tailored_application.md", "w") as f:
-        f.write(output_content)
+    with tracing.span("write_output"):
+        with open("tailored_application.md", "w") as f:
+            f.write(output_content)
 
     print("Successfully created tailored_application.md")
 
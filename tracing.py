@@ -0,0 +1,168 @@
+"""Lightweight per-stage tracing with JSON-lines and Prometheus text export.
+
+Spans are recorded into the current ``Trace`` (held in a ContextVar, so each
+Streamlit script run, asyncio task or copied thread context has its own) and
+aggregated into process-wide ``METRICS`` for Prometheus.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+# Numeric span attributes that are summed into Prometheus counters.
+COUNTED_ATTRIBUTES = ("prompt_tokens", "completion_tokens", "retries", "retries_saved")
+
+
+class Trace:
+    """Spans recorded during one unit of work (a Streamlit run or a CLI invocation)."""
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.spans: List[dict] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: dict) -> None:
+        with self._lock:
+            self.spans.append(record)
+
+    def to_jsonl(self) -> str:
+        with self._lock:
+            return "".join(json.dumps({"trace_id": self.trace_id, **record}) + "\n" for record in self.spans)
+
+
+class StageMetrics:
+    """Process-wide latency histograms and counters per stage."""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def observe(self, record: dict) -> None:
+        seconds = record["duration_ms"] / 1000
+        with self._lock:
+            stage = self._stages.setdefault(record["name"], {
+                "count": 0, "sum": 0.0, "errors": 0,
+                "buckets": [0] * len(LATENCY_BUCKETS),
+                "counters": dict.fromkeys(COUNTED_ATTRIBUTES, 0),
+            })
+            stage["count"] += 1
+            stage["sum"] += seconds
+            stage["errors"] += 1 if record.get("error") else 0
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stage["buckets"][i] += 1
+            for key in COUNTED_ATTRIBUTES:
+                value = record["attributes"].get(key)
+                if isinstance(value, (int, float)):
+                    stage["counters"][key] += value
+
+    def prometheus_text(self) -> str:
+        """Render all stages in the Prometheus text exposition format."""
+        lines = [
+            "# HELP career_flow_stage_duration_seconds Time spent in each pipeline stage.",
+            "# TYPE career_flow_stage_duration_seconds histogram",
+        ]
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self._stages.items()}
+        for name, stage in sorted(stages.items()):
+            for bound, count in zip(LATENCY_BUCKETS, stage["buckets"]):
+                lines.append(f'career_flow_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'career_flow_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+            lines.append(f'career_flow_stage_duration_seconds_sum{{stage="{name}"}} {stage["sum"]:.6f}')
+            lines.append(f'career_flow_stage_duration_seconds_count{{stage="{name}"}} {stage["count"]}')
+        lines += [
+            "# HELP career_flow_stage_errors_total Stage executions that raised an exception.",
+            "# TYPE career_flow_stage_errors_total counter",
+        ]
+        lines += [f'career_flow_stage_errors_total{{stage="{name}"}} {s["errors"]}' for name, s in sorted(stages.items())]
+        for key in COUNTED_ATTRIBUTES:
+            lines += [f"# TYPE career_flow_{key}_total counter"]
+            lines += [
+                f'career_flow_{key}_total{{stage="{name}"}} {s["counters"][key]}'
+                for name, s in sorted(stages.items()) if s["counters"][key]
+            ]
+        return "\n".join(lines) + "\n"
+
+
+METRICS = StageMetrics()
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("career_flow_trace", default=None)
+_current_span: ContextVar[Optional[dict]] = ContextVar("career_flow_span", default=None)
+
+
+def start_trace(trace_id: Optional[str] = None) -> Trace:
+    """Start a new trace for the current context and return it."""
+    trace = Trace(trace_id)
+    _current_trace.set(trace)
+    return trace
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def _finish(record: dict) -> None:
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(record)
+    METRICS.observe(record)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Time the enclosed block as stage ``name``; yields the span record for extra attributes."""
+    parent = _current_span.get()
+    record = {"name": name, "parent": parent["name"] if parent else None,
+              "start": time.time(), "attributes": dict(attributes)}
+    token = _current_span.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["duration_ms"] = (time.perf_counter() - started) * 1000
+        _current_span.reset(token)
+        _finish(record)
+
+
+def record(name: str, seconds: float, **attributes) -> None:
+    """Record a stage that was timed elsewhere (for example inside a worker process)."""
+    parent = _current_span.get()
+    _finish({"name": name, "parent": parent["name"] if parent else None, "start": time.time() - seconds,
+             "attributes": attributes, "duration_ms": seconds * 1000})
+
+
+def add(key: str, amount: float = 1) -> None:
+    """Add ``amount`` to a numeric attribute of the innermost active span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current["attributes"][key] = current["attributes"].get(key, 0) + amount
+
+
+def add_usage(usage) -> None:
+    """Add an OpenAI ``usage`` object's token counts to the innermost active span."""
+    if usage is not None:
+        add("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0)
+        add("completion_tokens", getattr(usage, "completion_tokens", 0) or 0)
+
+
+def export(trace: Trace, jsonl_path: Optional[str] = None, prometheus_path: Optional[str] = None) -> None:
+    """Append the trace's spans to a JSON-lines file and rewrite the Prometheus text file."""
+    if jsonl_path:
+        with open(jsonl_path, "a") as f:
+            f.write(trace.to_jsonl())
+    if prometheus_path:
+        # A unique temporary file per export, since concurrent script runs export at the same time.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(prometheus_path)), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(METRICS.prometheus_text())
+        os.chmod(tmp_path, 0o644)  # mkstemp creates 0600, which a separate collector user could not read
+        # Atomic replace so a node_exporter textfile collector never reads a partial file.
+        os.replace(tmp_path, prometheus_path)